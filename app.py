@@ -1,29 +1,43 @@
-import time
-
 import streamlit as st
-from scripts.database import init_db, insert_matches, get_all_matches, filter_matches
-from scripts.api import get_matches, get_leagues, get_seasons, BASE_URL, HEADERS
+import logging
+from scripts.database import init_db, insert_matches, filter_matches, count_matches, get_match_facets, \
+    get_league_catalogue, get_league_seasons, refresh_catalogue, refresh_catalogue_in_background, search_matches
+from scripts.api import get_matches
+from scripts.analytics import refresh_mirror_in_background
+from scripts.components import paginator, render_matches, api_match_rows, db_match_rows, render_diagnostics
+from scripts.metrics import start_trace, render_phase, log_event
 from streamlit_extras.switch_page_button import switch_page
 import pandas as pd
-import requests
-import json
 
 st.set_page_config(page_title="Football Dashboard", page_icon="⚽", layout="wide")
+start_trace()
 
-init_db()
-with open('assets/styles.css', encoding='utf-8') as f:
-    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+with render_phase('app', 'setup'):
+    init_db()
+    with open('assets/styles.css', encoding='utf-8') as f:
+        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
 st.title("FOOTBALL DASHBOARD 🚀")
 
-menu = ["Main", "Load matches", "View matches"]
-choice = st.sidebar.selectbox("Menu", menu)
 
-df = get_all_matches()
+def add_display_columns(matches):
+    matches["formatted_date"] = pd.to_datetime(matches["date"]).dt.strftime("%d %b, %Y %H:%M")
+    matches["match_display"] = matches["home_team"] + " vs " + matches["away_team"] + \
+                               " (" + matches["formatted_date"] + ")"
+    return matches
+
+
+def pick_match(matches, key):
+    selected_match_display = st.selectbox("Select a match", matches["match_display"], key=f"{key}_match_select")
+    selected_match_id = matches.loc[matches["match_display"] == selected_match_display, "id"].values[0]
+
+    if st.button("View match details", key=f"{key}_match_details"):
+        st.session_state.selected_match_id = selected_match_id
+        switch_page("match_details")
+
 
-leagues = get_leagues()
-seasons = sorted([season for season in get_seasons() if int(season) <= 2023], reverse=True)
-league_name_to_id = {league['league']['name']: league['league']['id'] for league in leagues}
+menu = ["Main", "Load matches", "View matches"]
+choice = st.sidebar.selectbox("Menu", menu)
 
 if choice == 'Main':
     st.subheader("Main page")
@@ -32,17 +46,32 @@ if choice == 'Main':
 elif choice == 'Load matches':
     st.subheader("Load Past Matches")
 
-    if not leagues or not seasons:
-        st.error("Failed to load data from the API. Please check your API key, quota, or internet connection.")
+    # The league/season catalogue lives in the local database; the API is only asked
+    # when it is missing (blocking, first run) or older than a day (in the background)
+    with render_phase('app', 'catalogue'):
+        if get_league_catalogue().empty:
+            with st.spinner("Downloading the league catalogue..."):
+                refresh_catalogue()
+        else:
+            refresh_catalogue_in_background()
 
-    if leagues and seasons:
-        league_name_to_id = {l['league']['name']: l['league']['id'] for l in leagues}
+        leagues = get_league_catalogue()
+        league_name_to_id = dict(zip(leagues['name'], leagues['id']))
+        seasons = [season for season in get_league_seasons() if season <= 2023]
 
+    if leagues.empty or not seasons:
+        st.error("Failed to load data from the API. Please check your API key, quota, or internet connection.")
+
+    if not leagues.empty and seasons:
         selected_league_name = st.selectbox(
             "Select a league",
             list(league_name_to_id.keys()),
             key="league_select"
         )
+        seasons = [season for season in get_league_seasons(league_name_to_id[selected_league_name])
+                   if season <= 2023]
+        if st.session_state.get("season_select") not in seasons:
+            st.session_state.pop("season_select", None)
 
         selected_season = st.selectbox(
             "Select a season",
@@ -55,9 +84,9 @@ elif choice == 'Load matches':
 
             if league_id and selected_season:
                 st.info(f"Fetching matches for {selected_league_name} ({selected_season})...")
-                matches = get_matches(league_id, selected_season)
+                with render_phase('app', 'fetch_matches'):
+                    matches = get_matches(league_id, selected_season)
                 st.session_state.loaded_matches = matches
-                st.write(f"[DEBUG] Got {len(matches)} matches")
 
         if "loaded_matches" in st.session_state:
             matches = st.session_state.loaded_matches
@@ -65,53 +94,77 @@ elif choice == 'Load matches':
                 st.success(f"Fetched {len(matches)} past matches")
                 st.header("Finished Matches")
 
-                for match in matches:
-                    cols = st.columns([1, 4, 1])
-                    with cols[0]:
-                        logo = match['teams']['home']['logo']
-                        if logo:
-                            st.image(logo, width=50)
-                        st.write(match['teams']['home']['name'])
-
-                    with cols[1]:
-                        st.write(
-                            f"**{match['teams']['home']['name']}** vs **{match['teams']['away']['name']}**")
-                        st.write(
-                            f"Date: {match['fixture']['date']} | Status: {match['fixture']['status']['short']}")
-
-                    with cols[2]:
-                        logo = match['teams']['away']['logo']
-                        if logo:
-                            st.image(logo, width=50)
-                        st.write(match['teams']['away']['name'])
+                table_mode = st.toggle("Compact table", key="loaded_table_mode")
+                limit, offset = paginator("loaded", len(matches))
+                with render_phase('app', 'loaded_list'):
+                    render_matches(api_match_rows(matches[offset:offset + limit]), table=table_mode)
+
+                with_lineups = st.checkbox("Fetch lineups (uses one API request per match)", value=True,
+                                           key="save_with_lineups")
 
                 if st.button("Save All Finished Matches", key="save_matches"):
-                    st.write("[DEBUG] Saving to database...")
+                    progress_bar = st.progress(0.0, text="Fetching lineups...")
+
+                    def show_progress(done, total):
+                        progress_bar.progress(done / total, text=f"Fetched lineups for {done}/{total} matches")
+
                     try:
-                        insert_matches(matches)
-                        st.success(f"Saved {len(matches)} matches into the database!")
+                        with render_phase('app', 'save_matches'):
+                            counts = insert_matches(matches, with_lineups=with_lineups, progress=show_progress)
+                        progress_bar.progress(1.0, text="Done")
+                        refresh_mirror_in_background()
+                        st.success(f"Saved {len(matches)} matches into the database! "
+                                   f"({counts['inserted']} new, {counts['updated']} updated, "
+                                   f"{counts['unchanged']} unchanged)")
                     except Exception as a:
-                        st.write(f"Error with insert,type of error {a}")
+                        log_event('save_failed', logging.ERROR, error=repr(a))
+                        st.error(f"Error with insert, type of error {a}")
 
 
 elif choice == 'View matches':
     st.subheader('View matches')
 
-    stored_matches = get_all_matches()
-
-    if not stored_matches.empty:
-
-        stored_matches['short_date'] = pd.to_datetime(stored_matches['date']).dt.strftime('%Y-%m-%d')
-
-        seasons = sorted(stored_matches['season'].dropna().unique())
-        teams = sorted(set(stored_matches['home_team'].dropna()) | set(stored_matches['away_team'].dropna()))
-        competitions = sorted(stored_matches['competition'].dropna().unique())
-        dates = sorted(stored_matches['short_date'].dropna().unique())
-
-        season_filter = st.selectbox("Filter by season", ['ALL'] + list(seasons))
-        team_filter = st.selectbox("Filter by teams", ['ALL'] + list(teams))
-        competition_filter = st.selectbox("Filter by competition", ['ALL'] + list(competitions))
-        date_filter = st.selectbox("Filter by date", ['ALL'] + list(dates))
+    filter_labels = {
+        'season': "Filter by season",
+        'team': "Filter by teams",
+        'competition': "Filter by competition",
+        'date': "Filter by date",
+    }
+    # Each dropdown is narrowed by the values picked in the others
+    current = {name: st.session_state.get(f"{name}_filter", 'ALL') for name in filter_labels}
+    with render_phase('app', 'facets'):
+        facets = get_match_facets(**{name: None if value == 'ALL' else value for name, value in current.items()})
+
+    if facets['total'] or any(value != 'ALL' for value in current.values()):
+
+        query = st.text_input("Search teams, competitions and players", key="match_search",
+                              placeholder="e.g. Man Utd, Premier League, Saka")
+        if query.strip():
+            with render_phase('app', 'search'):
+                results = search_matches(query)
+            terms = ' + '.join('/'.join(words) for words in results['terms'])
+            if results['matches'].empty:
+                st.warning(f"No matches found for {terms or query}.")
+            else:
+                found = add_display_columns(results['matches'])
+                st.success(f"Top {len(found)} matches for {terms}")
+                with st.expander("Click to view search results", expanded=True):
+                    with render_phase('app', 'search_list'):
+                        render_matches(db_match_rows(found))
+                pick_match(found, "search")
+            st.divider()
+
+        selected = {}
+        for name, label in filter_labels.items():
+            counts = dict(facets[name])
+            options = ['ALL'] + list(counts)
+            if current[name] not in options:
+                st.session_state[f"{name}_filter"] = 'ALL'
+            selected[name] = st.selectbox(
+                label, options, key=f"{name}_filter",
+                format_func=lambda value, counts=counts: value if value == 'ALL' else f"{value} ({counts[value]})"
+            )
+        season_filter, team_filter, competition_filter, date_filter = selected.values()
 
         if st.button('Show filtered matches'):
             season = None if season_filter == 'ALL' else season_filter
@@ -119,41 +172,29 @@ elif choice == 'View matches':
             competition = None if competition_filter == 'ALL' else competition_filter
             date = None if date_filter == 'ALL' else date_filter
 
-            filtered_matches = filter_matches(season=season, team=team, competition=competition, date=date)
-            st.session_state.filtered_matches = filtered_matches
-        else:
-            filtered_matches = st.session_state.get("filtered_matches", None)
-
-        if filtered_matches is not None and not filtered_matches.empty:
-            st.success(f"Found {len(filtered_matches)} matches")
-
-            filtered_matches["formatted_date"] = pd.to_datetime(filtered_matches["date"]).dt.strftime("%d %b, %Y %H:%M")
-            filtered_matches["match_display"] = filtered_matches["home_team"] + " vs " + filtered_matches["away_team"] + \
-                                                " (" + filtered_matches["formatted_date"] + ")"
-
-            with st.expander("Click to view filtered matches"):
-                for _, match in filtered_matches.iterrows():
-                    cols = st.columns([1, 4, 1])
-                    with cols[0]:
-                        if pd.notna(match.get('home_team_logo')):
-                            st.image(match['home_team_logo'], width=50)
-                        st.write(match['home_team'])
-                    with cols[1]:
-                        st.write(f"**{match['home_team']}** vs **{match['away_team']}**")
-                        st.write(f"Date: {match['formatted_date']} | Status: {match['status']}")
-                    with cols[2]:
-                        if pd.notna(match.get('away_team_logo')):
-                            st.image(match['away_team_logo'], width=50)
-                        st.write(match['away_team'])
-
-            selected_match_display = st.selectbox("Select a match", filtered_matches["match_display"])
-            selected_match_id = \
-                filtered_matches.loc[filtered_matches["match_display"] == selected_match_display, "id"].values[0]
-
-            if st.button("View match details"):
-                st.session_state.selected_match_id = selected_match_id
-                switch_page("match_details")
+            st.session_state.match_filters = dict(season=season, team=team, competition=competition, date=date)
+
+        filters = st.session_state.get("match_filters", None)
+        total = count_matches(**filters) if filters is not None else 0
+
+        if total:
+            st.success(f"Found {total} matches")
+
+            table_mode = st.toggle("Compact table", key="filtered_table_mode")
+            limit, offset = paginator("filtered", total)
+            with render_phase('app', 'filter_query'):
+                filtered_matches = filter_matches(**filters, limit=limit, offset=offset)
+
+            filtered_matches = add_display_columns(filtered_matches)
+
+            with st.expander("Click to view filtered matches", expanded=table_mode):
+                with render_phase('app', 'match_list'):
+                    render_matches(db_match_rows(filtered_matches), table=table_mode)
+
+            pick_match(filtered_matches, "filtered")
         else:
             st.warning("No matches found for the selected filters.")
     else:
         st.info("No matches stored in database.")
+
+render_diagnostics()
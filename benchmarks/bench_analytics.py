@@ -0,0 +1,74 @@
+# Season-scale aggregates: the pandas path over get_all_matches() versus DuckDB over the Parquet mirror.
+# Run from the repository root: python -m benchmarks.bench_analytics [rows]
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+workdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = os.path.join(workdir, "bench.db")
+os.environ["ANALYTICS_PATH"] = os.path.join(workdir, "analytics")
+
+from scripts import analytics, database
+from benchmarks.synthetic import make_fixture, make_fixtures
+
+TEAMS = ['Team 1000', 'Team 1005', 'Team 2003']
+
+
+def pandas_competition_summary():
+    # What an aggregate view would do today: load everything, then group in pandas
+    df = database.get_all_matches()
+    return analytics._competition_summary_pandas(df)
+
+
+def pandas_team_trends():
+    df = database.get_all_matches()
+    home = df[df['home_team'].isin(TEAMS)].assign(team=lambda d: d['home_team'], gf=lambda d: d['home_score'],
+                                                  ga=lambda d: d['away_score'])
+    away = df[df['away_team'].isin(TEAMS)].assign(team=lambda d: d['away_team'], gf=lambda d: d['away_score'],
+                                                  ga=lambda d: d['home_score'])
+    sides = pd.concat([home, away])
+    return sides.groupby(['team', 'season']).agg(goals_for=('gf', 'sum'), goals_against=('ga', 'sum'))
+
+
+def timed(label, fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        database.query_cache.clear()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<44} {best * 1000:>9.1f} ms")
+    return best
+
+
+def main(rows):
+    if not analytics.available():
+        sys.exit("duckdb is not installed; nothing to compare against")
+    database.init_db()
+    database.insert_matches(make_fixtures(rows), with_lineups=False)
+    print(f"{rows:,} fixtures")
+
+    start = time.perf_counter()
+    stats = analytics.refresh_mirror(full=True)
+    print(f"{'initial mirror build':<44} {(time.perf_counter() - start) * 1000:>9.1f} ms ({stats['written']} partitions)")
+
+    # A new matchday in one competition-season
+    database.insert_matches([make_fixture(i, league=0, season=9) for i in range(rows, rows + 10)], with_lineups=False)
+    start = time.perf_counter()
+    stats = analytics.refresh_mirror()
+    print(f"{'incremental refresh after a 10-fixture round':<44} {(time.perf_counter() - start) * 1000:>9.1f} ms "
+          f"({stats['written']} rewritten, {stats['unchanged']} unchanged)")
+
+    slow = timed("pandas competition summary", pandas_competition_summary)
+    fast = timed("duckdb competition summary", analytics.competition_summary)
+    print(f"{'speedup':<44} {slow / fast:>9.1f}x")
+    slow = timed("pandas team trends (3 teams)", pandas_team_trends)
+    fast = timed("duckdb team trends (3 teams)", lambda: analytics.team_season_trends(TEAMS))
+    print(f"{'speedup':<44} {slow / fast:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,43 @@
+# Memory and time of get_all_matches() versus the compact load_matches() on a synthetic table.
+# Run from the repository root: python -m benchmarks.bench_loader [rows]
+import os
+import sys
+import tempfile
+import time
+
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from scripts import database
+from benchmarks.synthetic import make_fixtures
+
+FILTER_COLUMNS = ['season', 'home_team', 'away_team', 'competition', 'match_date']
+
+
+def measure(label, load):
+    database.query_cache.clear()
+    start = time.perf_counter()
+    df = load()
+    elapsed = time.perf_counter() - start
+    size = df.memory_usage(deep=True).sum()
+    print(f"{label:<38} {len(df.columns):>4} cols {size / 2 ** 20:>9.1f} MiB {elapsed * 1000:>9.0f} ms")
+    return size
+
+
+def main(rows):
+    database.init_db()
+    database.insert_matches(make_fixtures(rows), with_lineups=False)
+
+    print(f"{rows:,} fixtures")
+    baseline = measure("get_all_matches()", database.get_all_matches)
+    full = measure("load_matches()", database.load_matches)
+    filters = measure("load_matches(filter columns)", lambda: database.load_matches(FILTER_COLUMNS))
+    print(f"memory saved: {1 - full / baseline:.0%} (all columns), {1 - filters / baseline:.0%} (filter projection)")
+
+    peak = 0
+    for chunk in database.iter_matches(chunksize=10_000):
+        peak = max(peak, chunk.memory_usage(deep=True).sum())
+    print(f"iter_matches(chunksize=10_000) largest chunk: {peak / 2 ** 20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
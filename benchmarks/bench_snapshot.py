@@ -0,0 +1,45 @@
+# Snapshot export and import: a fresh load with deferred indexes, and a merge into a populated database.
+# Run from the repository root: python -m benchmarks.bench_snapshot [rows]
+import os
+import sys
+import tempfile
+import time
+
+workdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = os.path.join(workdir, "bench.db")
+
+from scripts import database, snapshot
+from benchmarks.synthetic import make_fixture
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    value = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed * 1000:>9.0f} ms")
+    return value, elapsed
+
+
+def main(rows):
+    database.init_db()
+    start = time.perf_counter()
+    for offset in range(0, rows, 100_000):
+        fixtures = [make_fixture(i) for i in range(offset, min(offset + 100_000, rows))]
+        database.insert_matches(fixtures, with_lineups=False)
+    print(f"{rows:,} fixtures inserted through insert_matches in {time.perf_counter() - start:.1f} s")
+
+    path = os.path.join(workdir, "snapshot.ndjson.gz")
+    timed("export", lambda: snapshot.export_snapshot(path))
+    print(f"{'snapshot size':<44} {os.path.getsize(path) / 1024 / 1024:>9.1f} MB "
+          f"({'orjson' if snapshot.orjson else 'json'})")
+
+    with database.engine.begin() as conn:
+        for table in snapshot.SNAPSHOT_TABLES + ['standings', 'team_stats']:
+            conn.exec_driver_sql(f"DELETE FROM {table}")
+    _, elapsed = timed("import into an empty database", lambda: snapshot.import_snapshot(path))
+    print(f"{'fixtures per second':<44} {rows / elapsed:>9,.0f}")
+    timed("merge the same snapshot again", lambda: snapshot.import_snapshot(path, merge=True))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,76 @@
+# League tables and team form: a Python loop over get_all_matches() versus the NumPy engines,
+# and the cost of keeping the materialized standings and team_stats current on save.
+# Run from the repository root: python -m benchmarks.bench_standings [rows]
+import os
+import sys
+import tempfile
+import time
+
+workdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = os.path.join(workdir, "bench.db")
+
+from scripts import database, standings, team_stats
+from benchmarks.synthetic import make_fixture, make_fixtures
+
+
+def loop_tables(df):
+    # What a league table page would do today: walk every stored match in Python
+    tables = {}
+    for match in df.itertuples():
+        if match.status != 'FT':
+            continue
+        for team, scored, conceded in ((match.home_team, match.home_score, match.away_score),
+                                       (match.away_team, match.away_score, match.home_score)):
+            row = tables.setdefault((match.season, match.competition, team), [0, 0, 0, 0])
+            row[0] += 1
+            row[1] += 3 if scored > conceded else 1 if scored == conceded else 0
+            row[2] += scored
+            row[3] += conceded
+    return tables
+
+
+def timed(label, fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        database.query_cache.clear()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<44} {best * 1000:>9.1f} ms")
+    return best
+
+
+def main(rows):
+    database.init_db()
+    start = time.perf_counter()
+    database.insert_matches(make_fixtures(rows), with_lineups=False)
+    print(f"{rows:,} fixtures inserted (standings + team_stats) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    df = database.get_all_matches()
+    slow = timed("python loop, every table", lambda: loop_tables(df))
+    fast = timed("numpy group-by, every table", lambda: standings.totals(df))
+    print(f"{'speedup':<44} {slow / fast:>9.1f}x")
+
+    with database.engine.begin() as conn:
+        start = time.perf_counter()
+        standings.rebuild_standings(conn)
+    print(f"{'full standings rebuild':<44} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    # A round of corrected results in one competition-season
+    round_fixtures = [make_fixture(i, league=0, season=9, home_score=4) for i in range(rows, rows + 10)]
+    timed("incremental save of a 10-fixture round", lambda: database.insert_matches(round_fixtures, with_lineups=False),
+          repeat=1)
+
+    def form_per_render():
+        # The old panel path: read the full table, then window one team's matches
+        df = database.get_all_matches()
+        return team_stats.compute_team_stats(df[(df['home_team'] == 'Team 1000') | (df['away_team'] == 'Team 1000')])
+
+    slow = timed("team form from the full table (per render)", form_per_render)
+    fast = timed("team form, one indexed read", lambda: database.get_team_stats('Team 1000', '2024'))
+    print(f"{'speedup':<44} {slow / fast:>9.1f}x")
+    timed("latest table (materialized)", lambda: database.get_standings('2024', 'League 1'))
+    timed("table as of matchday 19 (recomputed)", lambda: database.get_standings('2024', 'League 1', matchday=19))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,79 @@
+# Compares the old per-row SELECT-then-INSERT/UPDATE path with the bulk upsert in insert_matches.
+# Run from the repository root: python -m benchmarks.bench_upsert [sizes...]
+import os
+import sys
+import tempfile
+import time
+
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from sqlalchemy import delete
+
+from scripts import database
+from benchmarks.synthetic import make_fixture
+
+
+def legacy_insert(match_list):
+    # The pre-upsert implementation: one SELECT plus one INSERT/UPDATE per fixture
+    matches = database.matches
+    with database.engine.begin() as conn:
+        for match_data in match_list:
+            match = match_data['fixture']
+            score = match_data['score']
+            existing = conn.execute(matches.select().where(matches.c.id == match['id'])).fetchone()
+            if existing is None:
+                conn.execute(matches.insert().values(
+                    id=match['id'],
+                    date=match['date'],
+                    status=match['status']['short'],
+                    home_team=match_data['teams']['home']['name'],
+                    away_team=match_data['teams']['away']['name'],
+                    home_score=score['fulltime']['home'],
+                    away_score=score['fulltime']['away'],
+                    season=str(match_data['league']['season']),
+                    competition=match_data['league']['name'],
+                    home_team_logo=match_data['teams']['home']['logo'],
+                    away_team_logo=match_data['teams']['away']['logo'],
+                ))
+            elif existing.home_score != score['fulltime']['home']:
+                conn.execute(matches.update().where(matches.c.id == match['id'])
+                             .values(home_score=score['fulltime']['home']))
+
+
+def bulk_insert(match_list):
+    database.insert_matches(match_list, with_lineups=False)
+
+
+def timed(fn, rows):
+    start = time.perf_counter()
+    fn(rows)
+    return time.perf_counter() - start
+
+
+def run(size):
+    fresh = [make_fixture(i) for i in range(size)]
+    # Re-sync of the same season where a tenth of the scores changed
+    resync = [make_fixture(i, home_score=9 if i % 10 == 0 else None) for i in range(size)]
+    results = {}
+    for name, fn in (('legacy', legacy_insert), ('bulk', bulk_insert)):
+        with database.engine.begin() as conn:
+            conn.execute(delete(database.matches))
+        insert_time = timed(fn, fresh)
+        resync_time = timed(fn, resync)
+        results[name] = (size / insert_time, size / resync_time)
+    return results
+
+
+def main(sizes):
+    database.init_db()
+    print(f"{'rows':>8} {'path':>7} {'insert rows/s':>14} {'resync rows/s':>14}")
+    for size in sizes:
+        results = run(size)
+        for name, (insert_rate, resync_rate) in results.items():
+            print(f"{size:>8} {name:>7} {insert_rate:>14,.0f} {resync_rate:>14,.0f}")
+        speedup = results['bulk'][0] / results['legacy'][0]
+        print(f"{'':>8} {'speedup':>7} {speedup:>13.1f}x {results['bulk'][1] / results['legacy'][1]:>13.1f}x")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,37 @@
+# Fails if any filter combination used by the "View matches" page falls back to a full table scan
+# or sorts its rows instead of reading them in (kickoff_ts, id) order.
+# Run from the repository root: python -m benchmarks.check_query_plans
+import itertools
+import os
+import sys
+import tempfile
+
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "plans.db")
+
+from scripts import database
+
+FILTERS = {
+    'season': '2023',
+    'team': 'Arsenal',
+    'competition': 'Premier League',
+    'date': '2023-08-12',
+}
+
+
+def check():
+    database.init_db()
+    failures = []
+    for size in range(len(FILTERS) + 1):
+        for names in itertools.combinations(FILTERS, size):
+            query, params = database._filter_query(**{name: FILTERS[name] for name in names})
+            plan = database.explain_query_plan(query, params)
+            bad = [step for step in plan if step == 'SCAN matches' or 'TEMP B-TREE FOR ORDER BY' in step]
+            status = 'FAIL' if bad else 'ok'
+            print(f"{status:>4}  {', '.join(names) or '(no filter)':<35} {' | '.join(plan)}")
+            if bad:
+                failures.append(names)
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check() else 0)
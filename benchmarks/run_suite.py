@@ -0,0 +1,210 @@
+# End-to-end benchmark suite against the local API stand-in: fetch, ingest, query and
+# figure-building timings at a configurable scale, written to JSON for regression tracking.
+# Run from the repository root:
+#   python -m benchmarks.run_suite [--leagues 5 --seasons 4 --fixtures 380 --latency 0.02]
+#   python -m benchmarks.run_suite --baseline benchmarks/results/<earlier>.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.stub_server import start_stub_server
+from benchmarks.synthetic import make_dataset
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+# A metric slower than baseline * (1 + threshold) counts as a regression
+REGRESSION_THRESHOLD = 0.25
+
+
+def timed(fn, repeat=5, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'min_ms': round(samples[0], 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'runs': repeat,
+    }
+
+
+def report(results, name, value):
+    results[name] = value
+    if 'median_ms' in value:
+        print(f"{name:<44} {value['median_ms']:>10.1f} ms (min {value['min_ms']:.1f}, p95 {value['p95_ms']:.1f})")
+    else:
+        print(f"{name:<44} {value}")
+
+
+def run(args):
+    # scripts.* read their configuration at import time, so they are imported only once the
+    # environment points at the temporary database and the stub server
+    from scripts import api, database, visualizations
+    from scripts.analytics import team_season_trends
+
+    results = {}
+    database.init_db()
+    dataset_keys = sorted((league_id, season) for league_id in range(39, 39 + args.leagues)
+                          for season in range(2015, 2015 + args.seasons))
+
+    start = time.perf_counter()
+    fixtures = [fixture for league_id, season in dataset_keys for fixture in api.get_matches(league_id, season)]
+    elapsed = time.perf_counter() - start
+    report(results, 'fetch.fixtures', {'fixtures': len(fixtures), 'ms': round(elapsed * 1000, 1),
+                                       'fixtures_per_s': round(len(fixtures) / elapsed)})
+
+    lineup_ids = [fixture['fixture']['id'] for fixture in fixtures[:args.lineups]]
+    start = time.perf_counter()
+    api.get_lineups_for_matches(lineup_ids, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+    report(results, 'fetch.lineups', {'matches': len(lineup_ids), 'ms': round(elapsed * 1000, 1),
+                                      'matches_per_s': round(len(lineup_ids) / elapsed) if elapsed else None})
+
+    start = time.perf_counter()
+    database.insert_matches(fixtures, with_lineups=False)
+    elapsed = time.perf_counter() - start
+    report(results, 'ingest.insert_matches', {'fixtures': len(fixtures), 'ms': round(elapsed * 1000, 1),
+                                              'fixtures_per_s': round(len(fixtures) / elapsed)})
+
+    start = time.perf_counter()
+    database.insert_matches(fixtures, with_lineups=False)
+    elapsed = time.perf_counter() - start
+    report(results, 'ingest.insert_matches_unchanged', {'fixtures': len(fixtures), 'ms': round(elapsed * 1000, 1),
+                                                        'fixtures_per_s': round(len(fixtures) / elapsed)})
+
+    # Lineups are served from the response cache filled above, so this isolates the write side
+    start = time.perf_counter()
+    database.insert_matches(fixtures[:args.lineups], with_lineups=True, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+    report(results, 'ingest.insert_matches_with_lineups', {'fixtures': len(lineup_ids), 'ms': round(elapsed * 1000, 1),
+                                                           'fixtures_per_s': round(len(lineup_ids) / elapsed)})
+
+    clear = database.query_cache.clear
+    season, competition, team = '2015', 'League 1', 'Team 1000'
+    report(results, 'query.get_all_matches', timed(database.get_all_matches, args.repeat, clear))
+    report(results, 'query.load_matches', timed(database.load_matches, args.repeat, clear))
+    filters = {
+        'season': {'season': season},
+        'team': {'team': team},
+        'season_competition': {'season': season, 'competition': competition},
+        'season_team_page': {'season': season, 'team': team, 'limit': 25, 'offset': 0},
+    }
+    for name, kwargs in filters.items():
+        report(results, f'query.filter_matches.{name}',
+               timed(lambda: database.filter_matches(**kwargs), args.repeat, clear))
+    report(results, 'query.filter_matches.cached', timed(lambda: database.filter_matches(season=season),
+                                                         args.repeat))
+    report(results, 'query.get_match_facets', timed(database.get_match_facets, args.repeat, clear))
+
+    match = database.filter_matches(season=season, team=team, limit=1)
+    stats = database.get_team_stats(team)
+    report(results, 'figure.plot_match_goals', timed(lambda: visualizations.plot_match_goals(match), args.repeat))
+    report(results, 'figure.plot_team_performance',
+           timed(lambda: visualizations.plot_team_performance(team, stats), args.repeat))
+    report(results, 'figure.plot_team_form', timed(lambda: visualizations.plot_team_form(team, stats), args.repeat))
+    trends = team_season_trends([team, 'Team 1001'])
+    report(results, 'figure.plot_team_season_trends',
+           timed(lambda: visualizations.plot_team_season_trends(trends), args.repeat))
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _metric_ms(value):
+    return value.get('median_ms', value.get('ms'))
+
+
+def compare(document, baseline_path, threshold=REGRESSION_THRESHOLD):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline_document = json.load(f)
+    baseline, results = baseline_document['results'], document['results']
+    regressions = []
+    print(f"\nAgainst {baseline_path} ({baseline_document.get('commit')}):")
+    if baseline_document.get('scale') != document['scale']:
+        print(f"  note: baseline ran at a different scale {baseline_document.get('scale')}")
+    for name, value in results.items():
+        before = baseline.get(name)
+        if before is None or not _metric_ms(before) or _metric_ms(value) is None:
+            continue
+        ratio = _metric_ms(value) / _metric_ms(before)
+        flag = 'REGRESSION' if ratio > 1 + threshold else 'ok'
+        print(f"  {flag:<11} {name:<44} {ratio:>6.2f}x")
+        if flag != 'ok':
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fetch, ingest, queries and figures on synthetic data.")
+    parser.add_argument('--leagues', type=int, default=5)
+    parser.add_argument('--seasons', type=int, default=4)
+    parser.add_argument('--fixtures', type=int, default=380, help="fixtures per league season")
+    parser.add_argument('--lineups', type=int, default=200, help="fixtures whose lineups are fetched")
+    parser.add_argument('--latency', type=float, default=0.02, help="stub response latency in seconds")
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--output', help="results file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument('--baseline', help="earlier results file; exit 1 if anything regressed")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.leagues, args.seasons, args.fixtures)
+    server, stub, base_url = start_stub_server(dataset, latency=args.latency, page_size=args.page_size)
+    workdir = tempfile.mkdtemp()
+    os.environ.update({
+        'FOOTBALL_API_URL': base_url,
+        'FOOTBALL_API_KEY': 'benchmark',
+        'API_RATE_PER_MINUTE': '6000',
+        'DB_PATH': os.path.join(workdir, 'bench.db'),
+        'API_CACHE_PATH': os.path.join(workdir, 'api_cache.db'),
+        'ANALYTICS_PATH': os.path.join(workdir, 'analytics'),
+    })
+    print(f"{args.leagues} leagues x {args.seasons} seasons x {args.fixtures} fixtures, "
+          f"stub at {base_url} ({args.latency * 1000:.0f} ms latency)")
+    try:
+        results = run(args)
+    finally:
+        server.shutdown()
+
+    document = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': {name: getattr(args, name) for name in ('leagues', 'seasons', 'fixtures', 'lineups',
+                                                          'latency', 'page_size', 'workers', 'repeat')},
+        'stub_requests': dict(stub.counts),
+        'results': results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline and compare(document, args.baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+# Local stand-in for the api-sports.io endpoints the app uses (/leagues, /fixtures,
+# /fixtures/lineups), serving a synthetic dataset with paging, ETags and rate-limit headers.
+# Run from the repository root: python -m benchmarks.stub_server [--port 8099] [--latency 0.05]
+# then start the app or the sync CLI with FOOTBALL_API_URL=http://127.0.0.1:8099/
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import make_dataset, make_lineups
+
+
+class StubApi:
+    def __init__(self, dataset, latency=0.0, page_size=100, per_minute=6000, daily_limit=None):
+        self.latency = latency
+        self.page_size = page_size
+        self.per_minute = per_minute
+        self.daily_limit = daily_limit
+        self.leagues = dataset['leagues']
+        self.fixtures = dataset['fixtures']
+        self.by_id = {fixture['fixture']['id']: fixture
+                      for fixtures in self.fixtures.values() for fixture in fixtures}
+        self.counts = Counter()
+        self.used = 0
+        self._window = deque()
+        self._lock = threading.Lock()
+
+    def take_quota(self):
+        # Returns (allowed, per-minute remaining, daily remaining)
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            daily_left = None if self.daily_limit is None else self.daily_limit - self.used
+            if len(self._window) >= self.per_minute or daily_left == 0:
+                return False, self.per_minute - len(self._window), daily_left
+            self._window.append(now)
+            self.used += 1
+            if daily_left is not None:
+                daily_left -= 1
+            return True, self.per_minute - len(self._window), daily_left
+
+    def leagues_response(self, params):
+        return self.leagues, None
+
+    def fixtures_response(self, params):
+        fixtures = self.fixtures.get((int(params.get('league', 0)), int(params.get('season', 0))), [])
+        if params.get('status'):
+            fixtures = [f for f in fixtures if f['fixture']['status']['short'] == params['status']]
+        if params.get('from') and params.get('to'):
+            fixtures = [f for f in fixtures if params['from'] <= f['fixture']['date'][:10] <= params['to']]
+        total = max(1, -(-len(fixtures) // self.page_size))
+        page = int(params.get('page', 1))
+        start = (page - 1) * self.page_size
+        return fixtures[start:start + self.page_size], {'current': page, 'total': total}
+
+    def lineups_response(self, params):
+        fixture = self.by_id.get(int(params.get('fixture', 0)))
+        return (make_lineups(fixture) if fixture else []), None
+
+    def handle(self, path, params):
+        routes = {
+            'leagues': self.leagues_response,
+            'fixtures': self.fixtures_response,
+            'fixtures/lineups': self.lineups_response,
+        }
+        endpoint = path.strip('/')
+        if endpoint not in routes:
+            return 404, {'errors': {'endpoint': f'Unknown endpoint {endpoint}'}}
+        response, paging = routes[endpoint](params)
+        body = {'get': endpoint, 'parameters': params, 'errors': [], 'results': len(response),
+                'paging': paging or {'current': 1, 'total': 1}, 'response': response}
+        return 200, body
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if api.latency:
+                time.sleep(api.latency)
+
+            allowed, minute_left, daily_left = api.take_quota()
+            headers = {'X-RateLimit-Limit': api.per_minute, 'X-RateLimit-Remaining': max(minute_left, 0)}
+            if api.daily_limit is not None:
+                headers['x-ratelimit-requests-limit'] = api.daily_limit
+                headers['x-ratelimit-requests-remaining'] = daily_left
+            api.counts[url.path.strip('/')] += 1
+
+            if not allowed:
+                status, payload = 429, json.dumps({'errors': {'rateLimit': 'Too many requests'}}).encode()
+                headers['Retry-After'] = 1
+            else:
+                status, body = api.handle(url.path, params)
+                payload = json.dumps(body).encode()
+                etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                headers['ETag'] = etag
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    status, payload = 304, b''
+
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, str(value))
+            if status != 304:
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_stub_server(dataset, host='127.0.0.1', port=0, **options):
+    # Serves in a daemon thread; returns (server, api, base_url). port=0 picks a free port.
+    api = StubApi(dataset, **options)
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-api", daemon=True).start()
+    return server, api, f"http://{host}:{server.server_address[1]}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic fixtures on a local api-sports.io stand-in.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--leagues', type=int, default=5)
+    parser.add_argument('--seasons', type=int, default=3)
+    parser.add_argument('--fixtures', type=int, default=380, help="fixtures per league season")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--per-minute', type=int, default=6000)
+    parser.add_argument('--daily-limit', type=int)
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.leagues, args.seasons, args.fixtures)
+    server, api, base_url = start_stub_server(
+        dataset, args.host, args.port, latency=args.latency, page_size=args.page_size,
+        per_minute=args.per_minute, daily_limit=args.daily_limit
+    )
+    print(f"[STUB] Serving {len(api.by_id):,} fixtures at {base_url} (FOOTBALL_API_URL={base_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
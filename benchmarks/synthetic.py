@@ -0,0 +1,92 @@
+# API-shaped synthetic fixtures for benchmarks; deterministic for a given fixture id.
+import random
+from datetime import datetime, timedelta, timezone
+
+SEASON_START = datetime(2015, 8, 1, 14, 0, tzinfo=timezone.utc)
+
+
+def make_fixture(i, teams_per_league=20, leagues=5, seasons=10, home_score=None, status='FT',
+                 league=None, season=None):
+    # league/season pin the fixture to one competition-season (0-based indexes)
+    rng = random.Random(i)
+    league = i % leagues if league is None else league
+    season = (i // leagues) % seasons if season is None else season
+    home = rng.randrange(teams_per_league)
+    away = (home + 1 + rng.randrange(teams_per_league - 1)) % teams_per_league
+    home_id = 1000 * (league + 1) + home
+    away_id = 1000 * (league + 1) + away
+    kickoff = SEASON_START + timedelta(days=365 * season + rng.randrange(280), hours=rng.choice([0, 2, 5]))
+    return {
+        'fixture': {'id': i + 1, 'date': kickoff.isoformat(), 'status': {'short': status}},
+        'league': {
+            'id': 39 + league,
+            'name': f'League {league + 1}',
+            'season': 2015 + season,
+            'round': f'Regular Season - {rng.randrange(1, 39)}',
+        },
+        'teams': {
+            'home': {'id': home_id, 'name': f'Team {home_id}',
+                     'logo': f'https://media.api-sports.io/football/teams/{home_id}.png'},
+            'away': {'id': away_id, 'name': f'Team {away_id}',
+                     'logo': f'https://media.api-sports.io/football/teams/{away_id}.png'},
+        },
+        'score': {'fulltime': {
+            'home': rng.choice([0, 0, 1, 1, 1, 2, 2, 3, 4]) if home_score is None else home_score,
+            'away': rng.choice([0, 0, 1, 1, 2, 2, 3]),
+        }},
+    }
+
+
+def make_fixtures(count, **kwargs):
+    return [make_fixture(i, **kwargs) for i in range(count)]
+
+
+POSITIONS = ['G', 'D', 'D', 'D', 'D', 'M', 'M', 'M', 'F', 'F', 'F']
+
+
+def make_lineups(fixture, substitutes=7):
+    # API-shaped /fixtures/lineups response for one synthetic fixture
+    rng = random.Random(fixture['fixture']['id'])
+    lineups = []
+    for side in ('home', 'away'):
+        team = fixture['teams'][side]
+        squad = [team['id'] * 100 + number for number in range(1, 26)]
+        rng.shuffle(squad)
+        players = [{'player': {'id': player_id, 'name': f'Player {player_id}', 'number': player_id % 100,
+                               'pos': POSITIONS[min(slot, 10)], 'grid': f'{slot // 4 + 1}:{slot % 4 + 1}'}}
+                   for slot, player_id in enumerate(squad[:11 + substitutes])]
+        for player in players[11:]:
+            player['player']['grid'] = None
+        lineups.append({
+            'team': dict(team),
+            'formation': rng.choice(['4-4-2', '4-3-3', '3-5-2', '4-2-3-1']),
+            'startXI': players[:11],
+            'substitutes': players[11:],
+        })
+    return lineups
+
+
+def make_league(league, seasons=10):
+    return {
+        'league': {'id': 39 + league, 'name': f'League {league + 1}', 'type': 'League',
+                   'logo': f'https://media.api-sports.io/football/leagues/{39 + league}.png'},
+        'country': {'name': f'Country {league + 1}'},
+        'seasons': [{'year': 2015 + season, 'start': f'{2015 + season}-08-01', 'end': f'{2016 + season}-05-31',
+                     'current': season == seasons - 1} for season in range(seasons)],
+    }
+
+
+def make_dataset(leagues=5, seasons=10, fixtures_per_season=380, teams_per_league=20):
+    # leagues x seasons x fixtures_per_season API-shaped fixtures, keyed by (league id, season year)
+    fixtures = {}
+    for league in range(leagues):
+        for season in range(seasons):
+            first = (league * seasons + season) * fixtures_per_season
+            fixtures[(39 + league, 2015 + season)] = [
+                make_fixture(i, teams_per_league=teams_per_league, league=league, season=season)
+                for i in range(first, first + fixtures_per_season)
+            ]
+    return {
+        'leagues': [make_league(league, seasons) for league in range(leagues)],
+        'fixtures': fixtures,
+    }
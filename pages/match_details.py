@@ -1,24 +1,36 @@
 import streamlit as st
-from scripts.database import get_all_matches
+from scripts.database import get_match, get_match_lineups, get_team_logos, get_team_stats
+from scripts.assets import logo_data_uri
 import datetime
-from scripts.visualizations import plot_match_goals, plot_team_performance
+from scripts.visualizations import plot_match_goals, plot_team_form, plot_team_performance
+from scripts.team_stats import form_string
+from scripts.components import render_diagnostics
+from scripts.metrics import start_trace, render_phase
 import pandas as pd
-import json
 
+start_trace()
 with open('assets/styles.css', encoding='utf-8') as f:
     st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
 match_id = st.session_state.get('selected_match_id', None)
 
 if match_id is not None:
-    stored_matches = get_all_matches()
-    selected_match = stored_matches[stored_matches['id'] == int(match_id)]
+    selected_match = get_match(match_id)
 
     if not selected_match.empty:
         home_team = selected_match.iloc[0]['home_team']
         away_team = selected_match.iloc[0]['away_team']
-        home_team_logo = selected_match.iloc[0]['home_team_logo']
-        away_team_logo = selected_match.iloc[0]['away_team_logo']
+        logos = get_team_logos()
+
+        def team_logo_src(side):
+            # Inline bytes from the local asset cache; the stored URL only for teams without an id
+            team_id = selected_match.iloc[0][f'{side}_team_id']
+            if pd.isna(team_id):
+                return selected_match.iloc[0][f'{side}_team_logo'] or ''
+            return logo_data_uri(int(team_id), logos.get(int(team_id))) or ''
+
+        home_team_logo = team_logo_src('home')
+        away_team_logo = team_logo_src('away')
 
         st.markdown("## ⚽ Match Details")
 
@@ -49,8 +61,9 @@ if match_id is not None:
         st.markdown("---")
 
         with st.expander("#### 📊 **Match Summary**"):
-            fig = plot_match_goals(selected_match)
-            st.plotly_chart(fig, use_container_width=False)
+            with render_phase('match_details', 'match_summary'):
+                fig = plot_match_goals(selected_match)
+                st.plotly_chart(fig, use_container_width=False)
 
         with st.expander("#### 📈 **Teams performance over time**"):
             team_options = [home_team, away_team]
@@ -63,23 +76,39 @@ if match_id is not None:
                 st.warning("Both teams are the same! Switching the second team automatically.")
                 team2 = [team for team in team_options if team != team1][0]
 
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.markdown(f"**{team1} performance:**")
-                fig1 = plot_team_performance(team1)
-                st.plotly_chart(fig1, use_container_width=True)
+            # Both teams' whole history in one read: form is per season, the goals chart spans every season
+            season = selected_match.iloc[0]['season']
+            with render_phase('match_details', 'team_stats_query'):
+                history = get_team_stats([team1, team2])
+            for column, team in zip(st.columns(2), [team1, team2]):
+                with column, render_phase('match_details', 'team_panel'):
+                    team_history = history[history['team'] == team]
+                    stats = team_history[team_history['season'] == season]
+                    st.markdown(f"**{team} · {season}**")
+                    if stats.empty:
+                        st.info("No finished matches this season.")
+                        continue
+                    latest = stats.iloc[-1]
+                    metrics = st.columns(3)
+                    metrics[0].metric("Form", form_string(stats), f"{latest['form_points_5']} pts in last 5",
+                                      delta_color="off")
+                    metrics[1].metric("Goals", f"{latest['season_goals_for']} - {latest['season_goals_against']}",
+                                      f"{latest['goals_for_10']} - {latest['goals_against_10']} in last 10",
+                                      delta_color="off")
+                    metrics[2].metric("Clean sheets", int(latest['season_clean_sheets']),
+                                      f"{latest['played']} played", delta_color="off")
+                    st.write(f"Scoring streak: **{latest['scoring_streak']}** "
+                             f"(season best {stats['scoring_streak'].max()}) · "
+                             f"Unbeaten: **{latest['unbeaten_streak']}**")
+                    st.plotly_chart(plot_team_form(team, stats), use_container_width=True)
+                    st.plotly_chart(plot_team_performance(team, team_history), use_container_width=True)
 
-            with col2:
-                st.markdown(f"**{team2} performance:**")
-                fig2 = plot_team_performance(team2)
-                st.plotly_chart(fig2, use_container_width=True)
-
-        lineups_raw = selected_match.iloc[0].get("lineups")
-        if lineups_raw:
-            try:
-                #print(f"Lineups Raw: {lineups_raw}") Debug
-                lineups = json.loads(lineups_raw)
+        try:
+            with render_phase('match_details', 'lineups_query'):
+                lineups = get_match_lineups(match_id)
+            if not lineups:
+                st.warning("No lineups available for this match.")
+            else:
                 st.markdown("### 🧩 Lineups")
                 for team_lineup in lineups:
                     team_name = team_lineup['team']['name']
@@ -90,11 +119,11 @@ if match_id is not None:
                     st.write(", ".join(starting) if starting else "Not available")
                     st.markdown("**Substitutes:**")
                     st.write(", ".join(subs) if subs else "Not available")
-            except Exception as e:
-                st.error(f"Failed to parse lineups: {e}")
-        else:
-            st.warning("No lineups available for this match.")
+        except Exception as e:
+            st.error(f"Failed to parse lineups: {e}")
     else:
         st.error("Match not found")
 else:
     st.warning("No match selected. Please select a match on the previous page.")
+
+render_diagnostics()
@@ -0,0 +1,45 @@
+import streamlit as st
+from scripts.analytics import available, competition_summary, team_season_trends
+from scripts.database import get_match_facets
+from scripts.visualizations import plot_team_season_trends
+from scripts.components import render_diagnostics
+from scripts.metrics import start_trace, render_phase
+
+start_trace()
+with open('assets/styles.css', encoding='utf-8') as f:
+    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+
+st.markdown("## 📈 Season Trends")
+if not available():
+    st.caption("Install duckdb to run these aggregates on the columnar mirror.")
+
+facets = get_match_facets()
+
+if facets['total']:
+    competitions = [competition for competition, _ in facets['competition']]
+    competition = st.selectbox("Competition", ['ALL'] + competitions, key="trends_competition")
+
+    with render_phase('season_trends', 'summary'):
+        summary = competition_summary(None if competition == 'ALL' else competition)
+    st.dataframe(
+        summary,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'avg_goals': st.column_config.NumberColumn("Goals / match", format="%.2f"),
+            'home_win_rate': st.column_config.NumberColumn("Home wins", format="%.2f"),
+            'draw_rate': st.column_config.NumberColumn("Draws", format="%.2f"),
+            'away_win_rate': st.column_config.NumberColumn("Away wins", format="%.2f"),
+        },
+    )
+
+    teams = [team for team, _ in facets['team']]
+    selected_teams = st.multiselect("Compare teams", teams, default=teams[:2], key="trends_teams")
+    if selected_teams:
+        with render_phase('season_trends', 'trends_chart'):
+            fig = plot_team_season_trends(team_season_trends(selected_teams))
+            st.plotly_chart(fig, use_container_width=True)
+else:
+    st.info("No matches stored in database.")
+
+render_diagnostics()
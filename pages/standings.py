@@ -0,0 +1,56 @@
+import streamlit as st
+from scripts.database import get_match_facets, get_matchday_count, get_standings
+from scripts.components import render_diagnostics
+from scripts.metrics import start_trace, render_phase
+
+start_trace()
+with open('assets/styles.css', encoding='utf-8') as f:
+    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+
+st.markdown("## 🏆 Standings")
+
+facets = get_match_facets()
+
+if facets['total']:
+    competitions = [competition for competition, _ in facets['competition']]
+    competition = st.selectbox("Competition", competitions, key="standings_competition")
+    seasons = [season for season, _ in get_match_facets(competition=competition)['season']]
+    season = st.selectbox("Season", seasons, index=len(seasons) - 1, key="standings_season")
+
+    last_matchday = get_matchday_count(season, competition)
+    cols = st.columns([2, 1])
+    with cols[0]:
+        if last_matchday > 1:
+            matchday = st.slider("As of matchday", 1, last_matchday, last_matchday, key="standings_matchday")
+        else:
+            matchday = last_matchday
+    with cols[1]:
+        venue = st.radio("Matches", ['All', 'Home', 'Away'], horizontal=True, key="standings_venue")
+
+    with render_phase('standings', 'table'):
+        table = get_standings(
+            season, competition,
+            matchday=None if matchday == last_matchday else matchday,
+            venue=None if venue == 'All' else venue.lower(),
+        )
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'position': "#",
+            'team': "Team",
+            'played': "P",
+            'won': "W",
+            'drawn': "D",
+            'lost': "L",
+            'goals_for': "GF",
+            'goals_against': "GA",
+            'goal_difference': "GD",
+            'points': "Pts",
+        },
+    )
+else:
+    st.info("No matches stored in database.")
+
+render_diagnostics()
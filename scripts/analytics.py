@@ -0,0 +1,236 @@
+# Optional columnar mirror of `matches` for season-scale aggregates.
+# With duckdb installed, matches are mirrored to Parquet files (one per season and competition)
+# and aggregates run in DuckDB; without it the same functions fall back to pandas over SQLite.
+import hashlib
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from scripts.database import load_matches, read_connection
+from scripts.metrics import log_event, traced_query
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+load_dotenv()
+ANALYTICS_PATH = os.getenv("ANALYTICS_PATH", "./data/analytics")
+MIRROR_COLUMNS = ['id', 'date', 'match_date', 'kickoff_ts', 'season', 'competition',
+                  'home_team', 'away_team', 'home_score', 'away_score', 'status']
+
+_refresh_lock = threading.Lock()
+
+
+def available():
+    return duckdb is not None
+
+
+def _manifest_path():
+    return os.path.join(ANALYTICS_PATH, 'manifest.json')
+
+
+def _load_manifest():
+    try:
+        with open(_manifest_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest):
+    tmp_path = _manifest_path() + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, _manifest_path())
+
+
+def _partition_file(season, competition):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', competition or 'unknown').strip('_')
+    digest = hashlib.sha1((competition or '').encode('utf-8')).hexdigest()[:8]
+    return os.path.join(ANALYTICS_PATH, 'matches', str(season), f"{slug}-{digest}.parquet")
+
+
+def _fingerprints():
+    # Cheap per-partition checksum: changes whenever a fixture is added or its score/status changes
+    query = (
+        "SELECT season, competition, COUNT(*), MAX(id), "
+        "TOTAL(id * (COALESCE(home_score, -1) + 2)), TOTAL(id * (COALESCE(away_score, -1) + 2)), "
+        "TOTAL(id * LENGTH(COALESCE(status, ''))) "
+        "FROM matches GROUP BY season, competition"
+    )
+    with read_connection() as connection:
+        rows = connection.execute(query).fetchall()
+    return {json.dumps([row[0], row[1]]): list(row[2:]) for row in rows}
+
+
+def _write_partition(season, competition, path):
+    # "=" rather than "IS" so the (season, competition) index is used; NULL keys are rare
+    conditions, params = [], []
+    for column, value in (('season', season), ('competition', competition)):
+        if value is None:
+            conditions.append(f"{column} IS NULL")
+        else:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    query = f"SELECT {', '.join(MIRROR_COLUMNS)} FROM matches WHERE {' AND '.join(conditions)} ORDER BY id"
+    with read_connection() as connection:
+        df = pd.read_sql(query, connection, params=params)
+    df['date'] = pd.to_datetime(df['date'], utc=True, format='ISO8601')
+    df['match_date'] = pd.to_datetime(df['match_date'])
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    con = duckdb.connect()
+    con.register('partition_df', df)
+    con.execute(f"COPY partition_df TO '{tmp_path}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+    con.close()
+    os.replace(tmp_path, path)
+    return len(df)
+
+
+@traced_query
+def refresh_mirror(full=False):
+    # Rewrites only the season/competition partitions whose fingerprint changed since the last run
+    if not available():
+        return None
+    with _refresh_lock:
+        os.makedirs(ANALYTICS_PATH, exist_ok=True)
+        manifest = {} if full else _load_manifest()
+        current = _fingerprints()
+        stats = {'written': 0, 'removed': 0, 'unchanged': 0, 'rows': 0}
+
+        for key, fingerprint in current.items():
+            entry = manifest.get(key)
+            path = _partition_file(*json.loads(key))
+            if entry and entry['fingerprint'] == fingerprint and os.path.exists(path):
+                stats['unchanged'] += 1
+                continue
+            stats['rows'] += _write_partition(*json.loads(key), path)
+            manifest[key] = {'file': path, 'fingerprint': fingerprint}
+            stats['written'] += 1
+
+        for key in set(manifest) - set(current):
+            if os.path.exists(manifest[key]['file']):
+                os.remove(manifest[key]['file'])
+            del manifest[key]
+            stats['removed'] += 1
+
+        _save_manifest(manifest)
+    log_event('mirror_refreshed', **stats)
+    return stats
+
+
+def refresh_mirror_in_background():
+    if not available():
+        return None
+    thread = threading.Thread(target=refresh_mirror, name="analytics-refresh", daemon=True)
+    thread.start()
+    return thread
+
+
+def _mirror_ready():
+    return available() and bool(_load_manifest())
+
+
+def query(sql, params=None):
+    # Runs DuckDB SQL against a `matches` view over the Parquet mirror
+    con = duckdb.connect()
+    try:
+        glob = os.path.join(ANALYTICS_PATH, 'matches', '*', '*.parquet').replace("'", "''")
+        con.execute(f"CREATE VIEW matches AS SELECT * FROM read_parquet('{glob}')")
+        return con.execute(sql, params or []).df()
+    finally:
+        con.close()
+
+
+COMPETITION_SUMMARY_SQL = """
+SELECT competition, season,
+       COUNT(*) AS matches,
+       AVG(home_score + away_score) AS avg_goals,
+       AVG(CASE WHEN home_score > away_score THEN 1.0 ELSE 0.0 END) AS home_win_rate,
+       AVG(CASE WHEN home_score = away_score THEN 1.0 ELSE 0.0 END) AS draw_rate,
+       AVG(CASE WHEN home_score < away_score THEN 1.0 ELSE 0.0 END) AS away_win_rate
+FROM matches
+WHERE home_score IS NOT NULL AND away_score IS NOT NULL {where}
+GROUP BY competition, season
+ORDER BY competition, season
+"""
+
+TEAM_TRENDS_SQL = """
+WITH sides AS (
+    SELECT home_team AS team, season, competition, home_score AS goals_for, away_score AS goals_against
+    FROM matches WHERE home_team IN ({teams}) AND home_score IS NOT NULL
+    UNION ALL
+    SELECT away_team AS team, season, competition, away_score AS goals_for, home_score AS goals_against
+    FROM matches WHERE away_team IN ({teams}) AND away_score IS NOT NULL
+)
+SELECT team, season,
+       COUNT(*) AS played,
+       SUM(CASE WHEN goals_for > goals_against THEN 1 ELSE 0 END) AS wins,
+       SUM(CASE WHEN goals_for = goals_against THEN 1 ELSE 0 END) AS draws,
+       SUM(CASE WHEN goals_for < goals_against THEN 1 ELSE 0 END) AS losses,
+       SUM(goals_for) AS goals_for,
+       SUM(goals_against) AS goals_against,
+       SUM(CASE WHEN goals_for > goals_against THEN 3 WHEN goals_for = goals_against THEN 1 ELSE 0 END) AS points
+FROM sides
+GROUP BY team, season
+ORDER BY team, season
+"""
+
+
+def _competition_summary_pandas(df):
+    df = df.dropna(subset=['home_score', 'away_score'])
+    home = df['home_score'].astype(int)
+    away = df['away_score'].astype(int)
+    df = df.assign(goals=home + away, home_win=(home > away).astype(float),
+                   draw=(home == away).astype(float), away_win=(home < away).astype(float))
+    summary = df.groupby(['competition', 'season'], observed=True).agg(
+        matches=('goals', 'size'), avg_goals=('goals', 'mean'), home_win_rate=('home_win', 'mean'),
+        draw_rate=('draw', 'mean'), away_win_rate=('away_win', 'mean'))
+    return summary.reset_index().sort_values(['competition', 'season'], ignore_index=True)
+
+
+@traced_query
+def competition_summary(competition=None):
+    if _mirror_ready():
+        where, params = ("AND competition = ?", [competition]) if competition else ("", [])
+        return query(COMPETITION_SUMMARY_SQL.format(where=where), params)
+    df = load_matches(['competition', 'season', 'home_score', 'away_score'])
+    if competition:
+        df = df[df['competition'] == competition]
+    return _competition_summary_pandas(df)
+
+
+@traced_query
+def team_season_trends(teams):
+    if isinstance(teams, str):
+        teams = [teams]
+    if _mirror_ready():
+        placeholders = ", ".join("?" for _ in teams)
+        return query(TEAM_TRENDS_SQL.format(teams=placeholders), list(teams) * 2)
+
+    df = load_matches(['season', 'home_team', 'away_team', 'home_score', 'away_score'])
+    df = df.dropna(subset=['home_score', 'away_score'])
+    frames = []
+    for side, other in (('home', 'away'), ('away', 'home')):
+        part = df[df[f'{side}_team'].isin(teams)]
+        frames.append(pd.DataFrame({
+            'team': part[f'{side}_team'].astype(str),
+            'season': part['season'].astype(str),
+            'goals_for': part[f'{side}_score'].astype(int),
+            'goals_against': part[f'{other}_score'].astype(int),
+        }))
+    sides = pd.concat(frames)
+    sides['wins'] = (sides['goals_for'] > sides['goals_against']).astype(int)
+    sides['draws'] = (sides['goals_for'] == sides['goals_against']).astype(int)
+    sides['losses'] = (sides['goals_for'] < sides['goals_against']).astype(int)
+    sides['points'] = sides['wins'] * 3 + sides['draws']
+    trends = sides.groupby(['team', 'season']).agg(
+        played=('wins', 'size'), wins=('wins', 'sum'), draws=('draws', 'sum'), losses=('losses', 'sum'),
+        goals_for=('goals_for', 'sum'), goals_against=('goals_against', 'sum'), points=('points', 'sum'))
+    return trends.reset_index()
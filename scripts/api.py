@@ -1,78 +1,172 @@
+import logging
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-import streamlit as st
+from scripts.cache import ResponseCache, make_key
+from scripts.client import ApiClient
+from scripts.metrics import log_event, registry, span
 
 load_dotenv()
 API_KEY = os.getenv("FOOTBALL_API_KEY")
-BASE_URL = "https://v3.football.api-sports.io/"
+# Point FOOTBALL_API_URL at a stand-in (e.g. benchmarks/stub_server.py) to run without a paid key
+BASE_URL = os.getenv("FOOTBALL_API_URL", "https://v3.football.api-sports.io/")
 
 HEADERS = {"x-apisports-key": API_KEY}
 
+cache = ResponseCache(os.getenv("API_CACHE_PATH", "./data/api_cache.db"))
+client = ApiClient(
+    BASE_URL,
+    HEADERS,
+    timeout=(float(os.getenv("API_CONNECT_TIMEOUT", 5)), float(os.getenv("API_READ_TIMEOUT", 30))),
+    max_retries=int(os.getenv("API_MAX_RETRIES", 4)),
+    per_minute=int(os.getenv("API_RATE_PER_MINUTE", 10)),
+)
+
+
+def _record_quota():
+    quota = client.get_quota()
+    registry.set('api_quota_remaining', round(client.bucket.tokens, 1), window='minute')
+    if quota['daily_remaining'] is not None:
+        registry.set('api_quota_remaining', quota['daily_remaining'], window='daily')
+    return quota['daily_remaining']
+
+
+def _get(endpoint, params=None, refresh=False):
+    # refresh=True skips fresh cache hits but still revalidates and falls back to stale data
+    key = make_key(endpoint, params)
+    with span('api', endpoint=endpoint.strip('/'), key=key) as fields:
+        cached = cache.lookup(key)
+        if cached is not None and cached['fresh'] and not refresh:
+            cache.count('hits')
+            fields['status'] = 'cache'
+            return cached['body']
+
+        headers = {}
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        ttl = cache.ttl_for(endpoint, params)
+        try:
+            response = client.get(endpoint, params=params, headers=headers)
+        except Exception as e:
+            fields.update(status='error', error=f"{type(e).__name__}: {e}")
+            response = None
+
+        if response is not None:
+            fields['status'] = response.status_code
+            fields['quota_remaining'] = _record_quota()
+
+            if response.status_code == 304 and cached is not None:
+                cache.touch(key, ttl)
+                cache.count('revalidated')
+                return cached['body']
+
+            if response.status_code == 200:
+                data = response.json()
+                # The API reports quota and auth problems as 200 with a non-empty "errors" field
+                if not data.get('errors'):
+                    cache.store(key, data, ttl,
+                                etag=response.headers.get('ETag'),
+                                last_modified=response.headers.get('Last-Modified'))
+                    cache.count('misses')
+                    fields['results'] = data.get('results')
+                    return data
+                fields['error'] = data.get('errors')
+            else:
+                fields['error'] = response.reason
+
+        if cached is not None:
+            fields['served'] = 'stale'
+            cache.count('stale')
+            return cached['body']
+        cache.count('misses')
+        return None
+
+
+def get_cache_stats():
+    return cache.get_stats()
+
+
+def get_quota():
+    return client.get_quota()
+
 
 def get_leagues():
-    url = f"{BASE_URL}/leagues"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        print(f"[LEAGUES] GET {url}")
-        print(f"[LEAGUES] Status Code: {response.status_code}")
-        print(f"[LEAGUES] Response Snippet: {response.text[:500]}")
-
-        if response.status_code == 200:
-            return response.json().get('response', [])
-        else:
-            return []
-    except Exception as e:
-        print(f"[LEAGUES] Exception: {e}")
+    data = _get('leagues')
+    if data is None:
         return []
+    return data.get('response', [])
 
 
 def get_seasons():
-    url = f"{BASE_URL}/leagues"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        print(f"[SEASONS] GET {url}")
-        print(f"[SEASONS] Status Code: {response.status_code}")
-        print(f"[SEASONS] Response Snippet: {response.text[:500]}")
-
-        if response.status_code == 200:
-            data = response.json()
-            seasons = set()
-            for league in data['response']:
-                for season in league['seasons']:
-                    seasons.add(season['year'])
-            return sorted(seasons, reverse=True)
-        else:
-            return []
-    except Exception as e:
-        print(f"[SEASONS] Exception: {e}")
-        return []
+    seasons = set()
+    for league in get_leagues():
+        for season in league.get('seasons', []):
+            seasons.add(season['year'])
+    return sorted(seasons, reverse=True)
 
 
-def get_matches(league_id, season):
-    url = f"{BASE_URL}fixtures"
+def iter_fixture_pages(league_id, season, date_from=None, date_to=None, start_page=1, refresh=False):
+    # Walks the response's paging block; yields (page, total_pages, fixtures) one page at a time
     params = {
         'league': league_id,
         'season': season,
         'status': 'FT'
 
     }
-    response = requests.get(url, headers=HEADERS, params=params)
+    # Optional YYYY-MM-DD window; the API wants both bounds together
+    if date_from and date_to:
+        params['from'] = date_from
+        params['to'] = date_to
 
-    print(f"Request to: {url} | Params: {params}")
-    print(f"Status: {response.status_code}, Body: {response.text[:500]}")
+    page = start_page
+    while True:
+        page_params = dict(params)
+        if page > 1:
+            page_params['page'] = page
+        data = _get('fixtures', page_params, refresh=refresh)
+        if data is None:
+            return
+        paging = data.get('paging') or {}
+        total = paging.get('total') or 1
+        yield page, total, data.get('response', [])
+        if page >= total:
+            return
+        page += 1
 
-    if response.status_code == 200:
-        data = response.json()
-        return data['response']
-    else:
-        print(f"Error API: {response.status_code} - {response.text}")
-        return []
+
+def iter_fixtures(league_id, season, date_from=None, date_to=None, start_page=1, refresh=False):
+    for _, _, fixtures in iter_fixture_pages(league_id, season, date_from, date_to, start_page, refresh):
+        yield from fixtures
+
+
+def get_matches(league_id, season, date_from=None, date_to=None, refresh=False):
+    return list(iter_fixtures(league_id, season, date_from=date_from, date_to=date_to, refresh=refresh))
 
 
 def get_lineups_for_match(match_id):
-    url = f"{BASE_URL}/fixtures/lineups?fixture={match_id}"
-    response = requests.get(url, headers=HEADERS)
-    if response.status_code == 200:
-        return response.json().get("response", [])
-    return None
+    data = _get('fixtures/lineups', {'fixture': match_id})
+    if data is None:
+        return None
+    return data.get("response", [])
+
+
+def get_lineups_for_matches(match_ids, max_workers=4, progress=None):
+    # The client's token bucket keeps the workers within the API rate limit
+    results = {}
+    match_ids = list(match_ids)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(get_lineups_for_match, match_id): match_id for match_id in match_ids}
+        for done, future in enumerate(as_completed(futures), start=1):
+            match_id = futures[future]
+            try:
+                results[match_id] = future.result()
+            except Exception as e:
+                log_event('lineups_failed', logging.WARNING, match_id=match_id, error=str(e))
+                results[match_id] = None
+            if progress:
+                progress(done, len(match_ids))
+    return results
@@ -0,0 +1,123 @@
+# Local team-logo cache: every logo is downloaded once, shrunk to the size the pages show it
+# at and served from disk, so rendering a match list never asks the browser to fetch remote images.
+import base64
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import requests
+from dotenv import load_dotenv
+
+from scripts.metrics import log_event, span
+
+try:
+    from PIL import Image
+except ImportError:  # logos are then stored as downloaded
+    Image = None
+
+load_dotenv()
+ASSETS_PATH = os.getenv("ASSETS_PATH", "./data/assets")
+LOGO_SIZE = int(os.getenv("LOGO_SIZE", 50))
+# A logo that failed to download is not retried for this long
+RETRY_FAILED_AFTER = 60 * 60
+# api-sports logo URLs carry the team id: https://media.api-sports.io/football/teams/33.png
+TEAM_LOGO_URL = re.compile(r'/teams/(\d+)\.\w+$')
+
+_logos = {}
+_failed = {}
+_lock = threading.Lock()
+_session = requests.Session()
+
+
+def team_id_from_logo(url):
+    match = TEAM_LOGO_URL.search(url or '')
+    return int(match.group(1)) if match else None
+
+
+def logo_path(team_id):
+    return os.path.join(ASSETS_PATH, 'teams', f'{int(team_id)}.png')
+
+
+def _thumbnail(content):
+    if Image is None:
+        return content
+    try:
+        with Image.open(BytesIO(content)) as image:
+            image = image.convert('RGBA')
+            image.thumbnail((LOGO_SIZE, LOGO_SIZE))
+            output = BytesIO()
+            image.save(output, 'PNG', optimize=True)
+        return output.getvalue()
+    except OSError:
+        return content
+
+
+def _download(team_id, url):
+    with span('asset', label='team_logo', team_id=team_id) as fields:
+        response = _session.get(url, timeout=10)
+        response.raise_for_status()
+        content = _thumbnail(response.content)
+        fields['bytes'] = len(content)
+
+    path = logo_path(team_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return content
+
+
+def team_logo(team_id, url=None):
+    # Thumbnail bytes for a team, downloaded from url on first use; None when unavailable
+    if team_id is None:
+        return None
+    team_id = int(team_id)
+    content = _logos.get(team_id)
+    if content is not None:
+        return content
+
+    path = logo_path(team_id)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            content = f.read()
+    elif url and time.monotonic() - _failed.get(team_id, -RETRY_FAILED_AFTER) >= RETRY_FAILED_AFTER:
+        try:
+            content = _download(team_id, url)
+        except requests.RequestException as e:
+            _failed[team_id] = time.monotonic()
+            log_event('logo_failed', logging.WARNING, team_id=team_id, url=url, error=str(e))
+    if content:
+        with _lock:
+            _logos[team_id] = content
+    return content
+
+
+def cache_logos(logos, max_workers=8):
+    # logos: {team_id: url}; fetches the ones not on disk yet in parallel, returns how many are available
+    missing = {team_id: url for team_id, url in logos.items()
+               if team_id is not None and int(team_id) not in _logos and not os.path.exists(logo_path(team_id))}
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+            list(executor.map(lambda item: team_logo(*item), missing.items()))
+    return sum(team_logo(team_id) is not None for team_id in logos if team_id is not None)
+
+
+def _mime_type(content):
+    if content.startswith(b'\xff\xd8'):
+        return 'image/jpeg'
+    if content.lstrip()[:5] in (b'<svg ', b'<?xml'):
+        return 'image/svg+xml'
+    return 'image/png'
+
+
+def logo_data_uri(team_id, url=None):
+    # For HTML and dataframe image columns, which take a URL rather than bytes
+    content = team_logo(team_id, url)
+    if not content:
+        return None
+    return f"data:{_mime_type(content)};base64,{base64.b64encode(content).decode('ascii')}"
@@ -0,0 +1,172 @@
+import json
+from collections import OrderedDict
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+
+FOREVER = None
+
+# Seconds a cached response stays fresh, per endpoint. FOREVER never expires.
+DEFAULT_TTLS = {
+    'leagues': 24 * 60 * 60,
+    'fixtures': 60 * 60,
+    'fixtures/lineups': FOREVER,
+}
+DEFAULT_TTL = 60 * 60
+
+
+def make_key(endpoint, params=None):
+    endpoint = endpoint.strip('/')
+    if not params:
+        return endpoint
+    query = '&'.join(f"{k}={params[k]}" for k in sorted(params))
+    return f"{endpoint}?{query}"
+
+
+class ResponseCache:
+    def __init__(self, path, ttls=None):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stale': 0, 'stores': 0}
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "body TEXT NOT NULL, "
+                "etag TEXT, "
+                "last_modified TEXT, "
+                "fetched_at REAL NOT NULL, "
+                "expires_at REAL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # Commits or rolls back like sqlite3's own context manager, then closes the connection
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            yield conn
+
+    def ttl_for(self, endpoint, params=None):
+        endpoint = endpoint.strip('/')
+        # Finished fixtures can't change any more, but a list of them still grows until
+        # its window is over: only closed date windows and long-finished seasons are final
+        if endpoint == 'fixtures' and params and params.get('status') == 'FT':
+            today = datetime.now(timezone.utc)
+            if params.get('to') and str(params['to']) < today.strftime('%Y-%m-%d'):
+                return FOREVER
+            if params.get('season') and int(params['season']) + 1 < today.year:
+                return FOREVER
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def lookup(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, expires_at = row
+        return {
+            'body': json.loads(body),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': expires_at is None or expires_at > time.time(),
+        }
+
+    def store(self, key, body, ttl, etag=None, last_modified=None):
+        now = time.time()
+        expires_at = None if ttl is FOREVER else now + ttl
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, fetched_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(body), etag, last_modified, now, expires_at)
+            )
+        self.count('stores')
+
+    def touch(self, key, ttl):
+        now = time.time()
+        expires_at = None if ttl is FOREVER else now + ttl
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE responses SET fetched_at = ?, expires_at = ? WHERE key = ?",
+                (now, expires_at, key)
+            )
+
+    def invalidate(self, key=None):
+        with self._connect() as conn:
+            if key is None:
+                conn.execute("DELETE FROM responses")
+            else:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        served = stats['hits'] + stats['revalidated'] + stats['stale']
+        total = served + stats['misses']
+        stats['hit_rate'] = served / total if total else 0.0
+        # Fresh hits never reach the API; 304 revalidations are usually not billed either
+        stats['requests_saved'] = stats['hits'] + stats['stale']
+        return stats
+
+
+class QueryCache:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.version = None
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self.version:
+                # Data changed since these results were read; drop them all
+                if self._entries:
+                    self.stats['invalidations'] += 1
+                self._entries.clear()
+                self.version = version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return True, self._entries[key]
+            self.stats['misses'] += 1
+            return False, None
+
+    def put(self, key, version, value):
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['version'] = self.version
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / total if total else 0.0
+        return stats
@@ -0,0 +1,144 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts.metrics import log_event
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class QuotaExhausted(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def sync(self, limit=None, remaining=None):
+        # The server's view of the per-minute window wins over our estimate
+        with self._lock:
+            self._refill()
+            if limit:
+                self.capacity = float(limit)
+                self.rate = limit / 60.0
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+
+
+def _int_header(headers, name):
+    value = headers.get(name)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _utc_day():
+    return datetime.now(timezone.utc).date()
+
+
+class ApiClient:
+    def __init__(self, base_url, headers, timeout=(5, 30), max_retries=4,
+                 backoff=1.0, max_backoff=30.0, per_minute=10, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.bucket = TokenBucket(per_minute)
+        self.daily_limit = None
+        self.daily_remaining = None
+        self.daily_remaining_day = None
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = _int_header(response.headers, 'Retry-After')
+            if retry_after is not None:
+                return retry_after
+        cap = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return random.uniform(cap / 2, cap)
+
+    def _update_limits(self, response):
+        headers = response.headers
+        self.bucket.sync(
+            limit=_int_header(headers, 'X-RateLimit-Limit'),
+            remaining=_int_header(headers, 'X-RateLimit-Remaining')
+        )
+        daily_limit = _int_header(headers, 'x-ratelimit-requests-limit')
+        daily_remaining = _int_header(headers, 'x-ratelimit-requests-remaining')
+        if daily_limit is not None:
+            self.daily_limit = daily_limit
+        if daily_remaining is not None:
+            self.daily_remaining = daily_remaining
+            self.daily_remaining_day = _utc_day()
+
+    def quota_exhausted(self):
+        # The daily quota resets at midnight UTC; a count reported on an earlier day no longer
+        # holds, so let the next request through to read the new one
+        if self.daily_remaining is not None and self.daily_remaining_day != _utc_day():
+            self.daily_remaining = None
+        return self.daily_remaining is not None and self.daily_remaining <= 0
+
+    def get(self, endpoint, params=None, headers=None):
+        url = f"{self.base_url}/{endpoint.strip('/')}"
+        attempt = 0
+        while True:
+            if self.quota_exhausted():
+                raise QuotaExhausted(f"Daily quota of {self.daily_limit} requests used up")
+
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._delay(attempt)
+                log_event('api_retry', logging.WARNING, endpoint=endpoint, error=str(e), delay_s=round(delay, 1))
+            else:
+                self._update_limits(response)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._delay(attempt, response)
+                log_event('api_retry', logging.WARNING, endpoint=endpoint, status=response.status_code,
+                          delay_s=round(delay, 1))
+            time.sleep(delay)
+            attempt += 1
+
+    def get_quota(self):
+        self.quota_exhausted()
+        return {
+            'daily_limit': self.daily_limit,
+            'daily_remaining': self.daily_remaining,
+            'per_minute': int(self.bucket.capacity),
+        }
@@ -0,0 +1,167 @@
+import math
+
+import pandas as pd
+import streamlit as st
+
+from scripts.api import get_cache_stats, get_quota
+from scripts.assets import cache_logos, logo_data_uri, team_logo
+from scripts.database import get_query_cache_stats, get_team_logos
+from scripts.metrics import current_trace, export_prometheus, registry, trace_elapsed_ms
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+def paginator(key, total, default_size=25):
+    # Renders page size / page number controls and returns (limit, offset) for the current page
+    cols = st.columns([1, 1, 2])
+    with cols[0]:
+        page_size = st.selectbox("Per page", PAGE_SIZES, index=PAGE_SIZES.index(default_size),
+                                 key=f"{key}_page_size")
+    pages = max(1, math.ceil(total / page_size))
+    with cols[1]:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    with cols[2]:
+        st.write("")
+        st.write(f"Page {page} of {pages} ({total} matches)")
+    return page_size, (page - 1) * page_size
+
+
+def render_match_rows(rows):
+    # rows: dicts with home_team, away_team, home_logo, away_logo and a details line
+    for row in rows:
+        cols = st.columns([1, 4, 1])
+        with cols[0]:
+            if row['home_logo']:
+                st.image(row['home_logo'], width=50)
+            st.write(row['home_team'])
+        with cols[1]:
+            st.write(f"**{row['home_team']}** vs **{row['away_team']}**")
+            st.write(row['details'])
+        with cols[2]:
+            if row['away_logo']:
+                st.image(row['away_logo'], width=50)
+            st.write(row['away_team'])
+
+
+def render_match_table(rows):
+    # One dataframe widget for the whole result instead of a row of columns per match
+    df = pd.DataFrame(rows, columns=['home_logo', 'home_team', 'score', 'away_team', 'away_logo', 'details'])
+    st.dataframe(
+        df,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'home_logo': st.column_config.ImageColumn("", width="small"),
+            'home_team': "Home",
+            'score': "Score",
+            'away_team': "Away",
+            'away_logo': st.column_config.ImageColumn("", width="small"),
+            'details': "Details",
+        },
+    )
+
+
+def api_match_rows(match_list):
+    return [{
+        'home_team': match['teams']['home']['name'],
+        'away_team': match['teams']['away']['name'],
+        'home_team_id': match['teams']['home'].get('id'),
+        'away_team_id': match['teams']['away'].get('id'),
+        'home_logo_url': match['teams']['home']['logo'],
+        'away_logo_url': match['teams']['away']['logo'],
+        'score': f"{match['goals']['home']} - {match['goals']['away']}" if match.get('goals') else "",
+        'details': f"Date: {match['fixture']['date']} | Status: {match['fixture']['status']['short']}",
+    } for match in match_list]
+
+
+def _team_id(value):
+    return int(value) if pd.notna(value) else None
+
+
+def db_match_rows(df):
+    logos = get_team_logos()
+    rows = []
+    for match in df.to_dict('records'):
+        home_id, away_id = _team_id(match['home_team_id']), _team_id(match['away_team_id'])
+        rows.append({
+            'home_team': match['home_team'],
+            'away_team': match['away_team'],
+            'home_team_id': home_id,
+            'away_team_id': away_id,
+            'home_logo_url': match['home_team_logo'] if pd.notna(match['home_team_logo']) else logos.get(home_id),
+            'away_logo_url': match['away_team_logo'] if pd.notna(match['away_team_logo']) else logos.get(away_id),
+            'score': f"{match['home_score']} - {match['away_score']}",
+            'details': f"Date: {match['formatted_date']} | Status: {match['status']}",
+        })
+    return rows
+
+
+def _add_logos(rows, data_uri=False):
+    # Logos come from the local asset cache; the page's missing ones are fetched together first.
+    # Only a team without an id falls back to its remote URL.
+    cache_logos({row[f'{side}_team_id']: row[f'{side}_logo_url'] for row in rows for side in ('home', 'away')})
+    local = logo_data_uri if data_uri else team_logo
+    for row in rows:
+        for side in ('home', 'away'):
+            team_id, url = row[f'{side}_team_id'], row[f'{side}_logo_url']
+            row[f'{side}_logo'] = local(team_id, url) if team_id is not None else url
+    return rows
+
+
+def render_matches(rows, table=False):
+    rows = _add_logos(rows, data_uri=table)
+    if table:
+        render_match_table(rows)
+    else:
+        render_match_rows(rows)
+
+
+def _span_name(span):
+    if span['kind'] == 'api':
+        return f"{span.get('endpoint')} [{span.get('status')}]"
+    if span['kind'] == 'db':
+        return span.get('label')
+    if span['kind'] == 'asset':
+        return f"{span.get('label')} {span.get('team_id')}"
+    return f"{span.get('page')}: {span.get('phase')}"
+
+
+def render_diagnostics():
+    # Sidebar breakdown of this rerun's spans plus process-wide timings; call last on a page
+    spans = current_trace()
+    elapsed_ms = trace_elapsed_ms()
+    cache_stats = get_cache_stats()
+    query_cache_stats = get_query_cache_stats()
+    registry.set('rerun_duration_seconds', round(elapsed_ms / 1000, 6))
+    registry.set('response_cache_hit_ratio', round(cache_stats['hit_rate'], 4))
+    registry.set('query_cache_hit_ratio', round(query_cache_stats['hit_rate'], 4))
+    registry.set('query_cache_entries', query_cache_stats['entries'])
+
+    with st.sidebar.expander("Diagnostics"):
+        st.caption(f"This rerun: {elapsed_ms:.0f} ms, {len(spans)} spans")
+        if spans:
+            st.dataframe(pd.DataFrame([{
+                'kind': span['kind'],
+                'name': _span_name(span),
+                'ms': span['duration_ms'],
+                'rows': span.get('rows'),
+            } for span in spans]), hide_index=True, use_container_width=True)
+
+        summaries = sorted(registry.summaries(), key=lambda row: row['sum'], reverse=True)[:10]
+        if summaries:
+            st.caption("Slowest overall (since start)")
+            st.dataframe(pd.DataFrame([{
+                'metric': row['name'].replace('_duration_seconds', ''),
+                'labels': ', '.join(f"{value}" for value in row['labels'].values() if value != ''),
+                'count': row['count'],
+                'p50 ms': round(row['p50'] * 1000, 1),
+                'p95 ms': round(row['p95'] * 1000, 1),
+                'total ms': round(row['sum'] * 1000, 1),
+            } for row in summaries]), hide_index=True, use_container_width=True)
+
+        quota = get_quota()
+        st.caption(f"API quota: {quota['daily_remaining'] if quota['daily_remaining'] is not None else '?'}"
+                   f"/{quota['daily_limit'] or '?'} today, {quota['per_minute']}/min · "
+                   f"response cache hit rate {cache_stats['hit_rate']:.0%} · "
+                   f"query cache hit rate {query_cache_stats['hit_rate']:.0%}")
+    export_prometheus()
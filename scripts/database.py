@@ -1,16 +1,66 @@
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, text
+from sqlalchemy import create_engine, event, MetaData, Table, Column, Index, Integer, String, text, select, func, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from dotenv import load_dotenv
 import sqlite3
 import pandas as pd
 import os
-import requests
-from scripts.api import get_lineups_for_match
+import logging
+import copy
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from scripts.api import get_lineups_for_matches, get_leagues
+from scripts.migrations import migrate
+from scripts.lineups import save_lineups, build_lineups
+from scripts.standings import (STAT_COLUMNS, league_table, matchdays, parse_matchday, snapshot_results,
+                                table_as_of, tied_teams, update_standings)
+from scripts.team_stats import TEAM_STATS_COLUMNS, update_team_stats
+from scripts.search import changed_documents, expand_query, index_matches, search_query
+from scripts.cache import QueryCache
+from scripts.metrics import log_event, registry, row_count, span, traced_query
 
 load_dotenv()
 db_path = os.getenv("DB_PATH")
-engine = create_engine(f"sqlite:///{db_path}")
+# One pooled engine for every read and write. check_same_thread is off because Streamlit
+# sessions and the sync workers share pooled connections across threads.
+engine = create_engine(
+    f"sqlite:///{db_path}",
+    connect_args={'timeout': 30, 'check_same_thread': False, 'cached_statements': 256},
+    pool_size=int(os.getenv("DB_POOL_SIZE", 8)),
+    max_overflow=8,
+)
 metadata = MetaData()
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # readers never wait for the writer
+    'synchronous': 'NORMAL',
+    'busy_timeout': 30000,
+    'cache_size': -32000,  # KiB
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+@event.listens_for(engine, "connect")
+def _configure_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+@contextmanager
+def read_connection():
+    # Raw sqlite3 connection borrowed from the engine's pool, so reads share its pragmas
+    # and statement cache; it goes back to the pool on exit
+    with engine.connect() as conn:
+        yield conn.connection.driver_connection
+
+
+query_cache = QueryCache(int(os.getenv("QUERY_CACHE_SIZE", 64)))
+
 matches = Table(
     'matches',
     metadata,
@@ -25,8 +75,21 @@ matches = Table(
     Column('competition', String),
     Column('home_team_logo', String),
     Column('away_team_logo', String),
-    Column('lineups', String)
-
+    Column('match_date', String),
+    Column('kickoff_ts', Integer),
+    Column('lineups_fetched', Integer, nullable=False, server_default=text('0')),
+    Column('round', String),
+    Column('matchday', Integer),
+    Column('home_team_id', Integer),
+    Column('away_team_id', Integer),
+    # Every filter of the match list ends in its (kickoff_ts, id) page order
+    Index('ix_matches_kickoff', 'kickoff_ts', 'id'),
+    Index('ix_matches_season_kickoff', 'season', 'kickoff_ts', 'id'),
+    Index('ix_matches_season_competition_kickoff', 'season', 'competition', 'kickoff_ts', 'id'),
+    Index('ix_matches_competition_kickoff', 'competition', 'kickoff_ts', 'id'),
+    Index('ix_matches_home_team_kickoff', 'home_team', 'kickoff_ts', 'id'),
+    Index('ix_matches_away_team_kickoff', 'away_team', 'kickoff_ts', 'id'),
+    Index('ix_matches_match_date_kickoff', 'match_date', 'kickoff_ts', 'id'),
 )
 
 leagues = Table(
@@ -43,140 +106,754 @@ leagues = Table(
 )
 
 
+teams = Table(
+    'teams',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String),
+    Column('logo', String),
+)
+
+players = Table(
+    'players',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String),
+)
+
+match_lineups = Table(
+    'match_lineups',
+    metadata,
+    Column('match_id', Integer, primary_key=True),
+    Column('slot', Integer, primary_key=True),
+    Column('team_id', Integer),
+    Column('player_id', Integer),
+    Column('player_name', String),
+    Column('number', Integer),
+    Column('position', String),
+    Column('grid', String),
+    Column('starter', Integer),
+    Column('formation', String),
+)
+
+sync_state = Table(
+    'sync_state',
+    metadata,
+    Column('league_id', Integer, primary_key=True),
+    Column('season', String, primary_key=True),
+    Column('last_synced_date', String),
+    Column('last_run_at', String),
+    Column('fixtures_synced', Integer, server_default=text('0')),
+    Column('resume_page', Integer),
+)
+
+league_seasons = Table(
+    'league_seasons',
+    metadata,
+    Column('league_id', Integer, primary_key=True),
+    Column('season', String, primary_key=True),
+    Column('start_date', String),
+    Column('end_date', String),
+    Column('current', Integer),
+)
+
+standings = Table(
+    'standings',
+    metadata,
+    Column('season', String, primary_key=True),
+    Column('competition', String, primary_key=True),
+    Column('team', String, primary_key=True),
+    Column('venue', String, primary_key=True),
+    *(Column(name, Integer, nullable=False, server_default=text('0')) for name in STAT_COLUMNS),
+)
+
+team_stats = Table(
+    'team_stats',
+    metadata,
+    Column('team', String, primary_key=True),
+    Column('match_id', Integer, primary_key=True),
+    Column('season', String),
+    Column('competition', String),
+    Column('kickoff_ts', Integer),
+    Column('match_date', String),
+    Column('venue', String),
+    Column('opponent', String),
+    Column('goals_for', Integer),
+    Column('goals_against', Integer),
+    Column('result', String),
+    *(Column(name, Integer) for name in TEAM_STATS_COLUMNS[TEAM_STATS_COLUMNS.index('points'):]),
+)
+
+meta = Table(
+    'meta',
+    metadata,
+    Column('key', String, primary_key=True),
+    Column('value', Integer),
+)
+
+
+def _bump_data_version(conn):
+    # Every write path calls this inside its transaction so cached reads are dropped
+    conn.execute(text(
+        "INSERT INTO meta (key, value) VALUES ('data_version', 1) "
+        "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+    ))
+
+
+def get_data_version():
+    return _get_meta('data_version') or 0
+
+
+def _get_meta(key):
+    with read_connection() as connection:
+        try:
+            row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+    return row[0] if row else None
+
+
+def _set_meta(conn, key, value):
+    conn.execute(text(
+        "INSERT INTO meta (key, value) VALUES (:key, :value) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+    ), {'key': key, 'value': value})
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def cached_query(fn):
+    # Results are shared by every session in the process and keyed by the data version,
+    # so a save from any session or process invalidates them. Callers get a copy.
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__name__, _freeze(args), tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+        version = get_data_version()
+        found, value = query_cache.get(key, version)
+        registry.inc('query_cache_requests_total', label=fn.__name__, result='hit' if found else 'miss')
+        if not found:
+            with span('db', label=fn.__name__) as fields:
+                value = fn(*args, **kwargs)
+                fields['rows'] = row_count(value)
+            query_cache.put(key, version, value)
+        if isinstance(value, pd.DataFrame):
+            return value.copy()
+        return copy.deepcopy(value)
+    return wrapper
+
+
+def get_query_cache_stats():
+    return query_cache.get_stats()
+
+
+UPSERT_CHUNK_SIZE = 500
+CATALOGUE_MAX_AGE = 24 * 60 * 60
+
+
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _bulk_upsert(conn, table, rows, update_columns, chunk_size=UPSERT_CHUNK_SIZE, fill_columns=()):
+    # INSERT ... ON CONFLICT(id) DO UPDATE, only touching rows whose values differ.
+    # fill_columns are only written when the stored value is still NULL.
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    if not rows:
+        return counts
+
+    stmt = sqlite_insert(table)
+    changed = [table.c[name].is_distinct_from(stmt.excluded[name]) for name in update_columns]
+    changed += [table.c[name].is_(None) & stmt.excluded[name].isnot(None) for name in fill_columns]
+    set_ = {name: stmt.excluded[name] for name in update_columns}
+    set_.update({name: func.coalesce(table.c[name], stmt.excluded[name]) for name in fill_columns})
+    stmt = stmt.on_conflict_do_update(index_elements=[table.c.id], set_=set_, where=or_(*changed))
+
+    for chunk in _chunks(rows, chunk_size):
+        ids = {row['id'] for row in chunk}
+        existing = conn.execute(select(table.c.id).where(table.c.id.in_(ids))).scalars().all()
+        # executemany: rowcount is the number of rows inserted or actually updated
+        affected = conn.execute(stmt, chunk).rowcount
+        inserted = len(ids) - len(existing)
+        counts['inserted'] += inserted
+        counts['updated'] += affected - inserted
+        counts['unchanged'] += len(existing) - (affected - inserted)
+    return counts
+
+
+@traced_query
 def insert_leagues(league_list):
-    with engine.connect() as conn:
-        for league_data in league_list:
-            league = league_data['league']
-            country = league_data.get('country', {})
-
-            seasons = league_data.get('seasons', [])
-            for season in seasons:
-                if not season.get('current', False):
-                    continue
-
-                league_id = league['id']
-                existing_league = conn.execute(
-                    leagues.select().where(
-                        (leagues.c.id == league_id) & (leagues.c.season == str(season['year']))
-                    )
-                ).fetchone()
-
-                if existing_league is None:
-                    conn.execute(leagues.insert().values(
-                        id=league_id,
-                        name=league['name'],
-                        country=country.get('name', 'Unknown'),
-                        logo=league.get('logo', ''),
-                        season=str(season['year']),
-                        start_date=season.get('start'),
-                        end_date=season.get('end'),
-                        type=league.get('type', 'League')
-                    ))
-        conn.commit()
+    rows = []
+    season_rows = []
+    for league_data in league_list:
+        league = league_data['league']
+        country = league_data.get('country', {})
+
+        seasons = league_data.get('seasons', [])
+        for season in seasons:
+            season_rows.append((league['id'], str(season['year']), season.get('start'), season.get('end'),
+                                int(bool(season.get('current', False)))))
+        if not seasons:
+            continue
+
+        # One catalogue row per league, describing its current (or else latest) season
+        season = next((s for s in seasons if s.get('current', False)), max(seasons, key=lambda s: s['year']))
+        rows.append({
+            'id': league['id'],
+            'name': league['name'],
+            'country': country.get('name', 'Unknown'),
+            'logo': league.get('logo', ''),
+            'season': str(season['year']),
+            'start_date': season.get('start'),
+            'end_date': season.get('end'),
+            'type': league.get('type', 'League'),
+        })
+
+    with engine.begin() as conn:
+        counts = _bulk_upsert(conn, leagues, rows,
+                              ['name', 'country', 'logo', 'season', 'start_date', 'end_date', 'type'])
+        if season_rows:
+            conn.exec_driver_sql(
+                "INSERT INTO league_seasons (league_id, season, start_date, end_date, current) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(league_id, season) DO UPDATE SET "
+                "start_date = excluded.start_date, end_date = excluded.end_date, current = excluded.current",
+                season_rows
+            )
+        _set_meta(conn, 'catalogue_refreshed_at', int(time.time()))
+        _bump_data_version(conn)
+    return counts
+
+
+_catalogue_lock = threading.Lock()
+
+
+def catalogue_age():
+    refreshed_at = _get_meta('catalogue_refreshed_at')
+    return None if refreshed_at is None else time.time() - refreshed_at
+
+
+def refresh_catalogue(max_age=CATALOGUE_MAX_AGE):
+    # Pulls /leagues into the local catalogue when it is missing or older than max_age seconds
+    if not _catalogue_lock.acquire(blocking=False):
+        return False
+    try:
+        age = catalogue_age()
+        if age is not None and age < max_age:
+            return False
+        league_list = get_leagues()
+        if not league_list:
+            return False
+        insert_leagues(league_list)
+        return True
+    finally:
+        _catalogue_lock.release()
+
+
+def refresh_catalogue_in_background(max_age=CATALOGUE_MAX_AGE):
+    age = catalogue_age()
+    if age is not None and age < max_age:
+        return None
+    thread = threading.Thread(target=refresh_catalogue, args=(max_age,), name="catalogue-refresh", daemon=True)
+    thread.start()
+    return thread
+
+
+@cached_query
+def get_league_catalogue():
+    with read_connection() as connection:
+        df = pd.read_sql("SELECT id, name, country, logo, type FROM leagues ORDER BY name", connection)
+    return df
 
 
+@cached_query
+def get_league_seasons(league_id=None):
+    with read_connection() as connection:
+        if league_id is None:
+            rows = connection.execute("SELECT DISTINCT season FROM league_seasons").fetchall()
+        else:
+            rows = connection.execute("SELECT season FROM league_seasons WHERE league_id = ?", (int(league_id),)).fetchall()
+    return sorted((int(row[0]) for row in rows), reverse=True)
+
+
+@cached_query
 def get_all_leagues():
-    connection = sqlite3.connect(db_path)
-    query = "SELECT * FROM leagues"
-    df = pd.read_sql(query, connection)
-    connection.close()
+    with read_connection() as connection:
+        query = "SELECT * FROM leagues"
+        df = pd.read_sql(query, connection)
     return df
 
 
+_initialized = False
+
+
 def init_db():
+    # Streamlit re-runs app.py on every interaction; the schema only needs checking once per process
+    global _initialized
+    if _initialized:
+        return
     metadata.create_all(engine)
-    print("Initialization complete!")
+    with engine.begin() as conn:
+        migrate(conn)
+    _initialized = True
+    log_event('db_initialized', path=db_path)
+
 
+def _kickoff(date):
+    # The API sends ISO dates with an offset; store the UTC day and epoch seconds
+    kickoff = datetime.fromisoformat(date).astimezone(timezone.utc)
+    return kickoff.strftime('%Y-%m-%d'), int(kickoff.timestamp())
 
-def insert_matches(match_list):
+
+@traced_query
+def insert_matches(match_list, with_lineups=True, progress=None, max_workers=4):
+    lineups_by_id = {}
+    if with_lineups:
+        match_ids = [match_data['fixture']['id'] for match_data in match_list]
+        lineups_by_id = get_lineups_for_matches(match_ids, max_workers=max_workers, progress=progress)
+
+    rows = []
+    team_rows = {}
+    for match_data in match_list:
+        try:
+            match = match_data['fixture']
+            match_teams = match_data['teams']
+            score = match_data['score']
+            league = match_data['league']
+            match_id = match['id']
+            match_date, kickoff_ts = _kickoff(match['date'])
+            home, away = match_teams['home'], match_teams['away']
+
+            rows.append({
+                'id': match_id,
+                'date': match['date'],
+                'status': match['status']['short'],
+                'home_team': home['name'],
+                'away_team': away['name'],
+                'home_team_id': home.get('id'),
+                'away_team_id': away.get('id'),
+                'home_score': score['fulltime']['home'] if score['fulltime'] else None,
+                'away_score': score['fulltime']['away'] if score['fulltime'] else None,
+                'season': str(league['season']),
+                'competition': league['name'],
+                # The logo lives on the teams row; only teams without an id keep it here
+                'home_team_logo': home['logo'] if home.get('id') is None else None,
+                'away_team_logo': away['logo'] if away.get('id') is None else None,
+                'match_date': match_date,
+                'kickoff_ts': kickoff_ts,
+                'round': league.get('round'),
+                'matchday': parse_matchday(league.get('round')),
+            })
+            for team in (home, away):
+                if team.get('id') is not None:
+                    team_rows[team['id']] = {'id': team['id'], 'name': team['name'], 'logo': team['logo']}
+        except Exception as e:
+            log_event('match_skipped', logging.WARNING,
+                      match_id=match_data.get('fixture', {}).get('id', 'unknown'), error=str(e))
+
+    # A fixture can appear twice in one payload; keep the last copy
+    rows = list({row['id']: row for row in rows}.values())
     with engine.begin() as conn:
-        for match_data in match_list:
-            try:
-                match = match_data['fixture']
-                teams = match_data['teams']
-                score = match_data['score']
-                league = match_data['league']
-                match_id = match['id']
-
-                home_logo = teams['home']['logo']
-                away_logo = teams['away']['logo']
-                home_score = score['fulltime']['home'] if score['fulltime'] else None
-                away_score = score['fulltime']['away'] if score['fulltime'] else None
-                status = match_data['fixture']['status']['short']
-
-                lineups = get_lineups_for_match(match_id)
-                #print(f"[LINEUPS] Match {match_id}: lineups = {lineups}") Debug
-
-                existing_match = conn.execute(
-                    matches.select().where(matches.c.id == match_id)
-                ).fetchone()
-
-                if existing_match is None:
-                    #print(f"[MATCHES] Inserting match {match_id}") debug
-                    conn.execute(matches.insert().values(
-                        id=match_id,
-                        date=match['date'],
-                        status=status,
-                        home_team=teams['home']['name'],
-                        away_team=teams['away']['name'],
-                        home_score=home_score,
-                        away_score=away_score,
-                        season=str(league['season']),
-                        competition=league['name'],
-                        home_team_logo=home_logo,
-                        away_team_logo=away_logo,
-                        lineups=json.dumps(lineups) if lineups else None
-                    ))
-                else:
-
-                    updated_fields = {}
-                    if existing_match.home_score != home_score:
-                        updated_fields['home_score'] = home_score
-                    if existing_match.away_score != away_score:
-                        updated_fields['away_score'] = away_score
-                    if existing_match.status != status:
-                        updated_fields['status'] = status
-                    if updated_fields:
-                        print(f"[DB] Updating match {match_id} with {updated_fields}")
-                        conn.execute(
-                            matches.update()
-                            .where(matches.c.id == match_id)
-                            .values(**updated_fields)
-                        )
-
-            except Exception as e:
-                print(f"[ERROR] Failed to insert match {match_data.get('fixture', {}).get('id', 'unknown')}: {e}")
+        match_ids = [row['id'] for row in rows]
+        before = snapshot_results(conn, match_ids)
+        # Names are refreshed too, so a renamed team or competition reaches standings, form and search
+        counts = _bulk_upsert(conn, matches, rows, ['home_team', 'away_team', 'competition', 'home_score',
+                                                    'away_score', 'status', 'round', 'matchday'],
+                              fill_columns=['home_team_id', 'away_team_id'])
+        search_ids = set()
+        if counts['inserted'] or counts['updated']:
+            after = snapshot_results(conn, match_ids)
+            update_standings(conn, before, after)
+            update_team_stats(conn, before, after)
+            search_ids = changed_documents(before, after)
+        team_counts = _bulk_upsert(conn, teams, list(team_rows.values()), ['name', 'logo'])
+        # None means the fetch failed or was skipped; leave those for backfill_lineups
+        saved_ids = {row['id'] for row in rows}
+        fetched = {match_id: lineups for match_id, lineups in lineups_by_id.items()
+                   if lineups is not None and match_id in saved_ids}
+        saved_lineups = save_lineups(conn, fetched)
+        index_matches(conn, search_ids | set(fetched))
+        if counts['inserted'] or counts['updated'] or team_counts['inserted'] or team_counts['updated'] \
+                or saved_lineups:
+            _bump_data_version(conn)
+    log_event('matches_saved', **counts)
+    return counts
 
 
+@traced_query
+def backfill_lineups(limit=None, progress=None, max_workers=4):
+    query = select(matches.c.id).where(matches.c.lineups_fetched == 0)
+    if limit:
+        query = query.limit(limit)
+    with engine.connect() as conn:
+        match_ids = [row.id for row in conn.execute(query)]
+    if not match_ids:
+        return 0
+
+    lineups_by_id = get_lineups_for_matches(match_ids, max_workers=max_workers, progress=progress)
+    fetched = {match_id: lineups for match_id, lineups in lineups_by_id.items() if lineups is not None}
+    with engine.begin() as conn:
+        filled = save_lineups(conn, fetched)
+        index_matches(conn, fetched)
+        if filled:
+            _bump_data_version(conn)
+    return filled
+
+
+@cached_query
 def get_all_matches():
-    connection = sqlite3.connect(db_path)
-    query = "SELECT id, date, home_team, away_team, home_score, away_score, status, season, competition, home_team_logo, away_team_logo, lineups FROM matches"
-    df = pd.read_sql(query, connection)
-    connection.close()
+    with read_connection() as connection:
+        query = "SELECT id, date, home_team, away_team, home_score, away_score, status, season, competition, home_team_logo, away_team_logo, match_date, kickoff_ts, home_team_id, away_team_id FROM matches"
+        df = pd.read_sql(query, connection)
     return df
 
 
-def filter_matches(season=None, team=None, competition=None, date=None):
-    connection = sqlite3.connect(db_path)
-    query = "SELECT * FROM matches WHERE 1=1"
+MATCH_COLUMNS = "id, date, home_team, away_team, home_score, away_score, status, season, competition, " \
+                "home_team_logo, away_team_logo, match_date, kickoff_ts, home_team_id, away_team_id"
+
+
+COMPACT_DTYPES = {
+    'id': 'int32',
+    'home_team': 'category',
+    'away_team': 'category',
+    'status': 'category',
+    'season': 'category',
+    'competition': 'category',
+    'home_team_logo': 'category',
+    'away_team_logo': 'category',
+    'home_score': 'Int8',
+    'away_score': 'Int8',
+    'kickoff_ts': 'Int64',
+    'home_team_id': 'Int32',
+    'away_team_id': 'Int32',
+    'lineups_fetched': 'int8',
+}
+DATE_COLUMNS = ('date', 'match_date')
+
+
+def _compact(df):
+    for column in df.columns:
+        if column in DATE_COLUMNS:
+            df[column] = pd.to_datetime(df[column], utc=column == 'date', format='ISO8601')
+        elif column in COMPACT_DTYPES:
+            df[column] = df[column].astype(COMPACT_DTYPES[column])
+    return df
+
+
+def _projection(columns):
+    if columns is None:
+        return [column.name for column in matches.columns]
+    unknown = set(columns) - set(matches.c.keys())
+    if unknown:
+        raise ValueError(f"Unknown match columns: {sorted(unknown)}")
+    return list(columns)
+
+
+@cached_query
+def load_matches(columns=None):
+    # Only the requested columns, with categorical/small-int/datetime dtypes
+    with read_connection() as connection:
+        query = f"SELECT {', '.join(_projection(columns))} FROM matches"
+        df = _compact(pd.read_sql(query, connection))
+    return df
+
+
+def iter_matches(columns=None, chunksize=50_000):
+    # Same as load_matches, but yields compact chunks so memory stays bounded on big tables
+    with read_connection() as connection:
+        query = f"SELECT {', '.join(_projection(columns))} FROM matches ORDER BY id"
+        for chunk in pd.read_sql(query, connection, chunksize=chunksize):
+            yield _compact(chunk)
+
+
+@cached_query
+def get_match(match_id):
+    # Primary-key lookup without the lineups blob; see get_match_lineups
+    with read_connection() as connection:
+        query = f"SELECT {MATCH_COLUMNS} FROM matches WHERE id = ?"
+        df = pd.read_sql(query, connection, params=[int(match_id)])
+    return df
+
+
+@cached_query
+def get_team_logos():
+    # {team_id: logo URL}, a few hundred rows at most; the images themselves are in scripts.assets
+    with read_connection() as connection:
+        rows = connection.execute("SELECT id, logo FROM teams WHERE logo IS NOT NULL").fetchall()
+    return dict(rows)
+
+
+@cached_query
+def get_match_lineups(match_id):
+    # None when lineups were never fetched, [] when the API had none
+    with read_connection() as connection:
+        # Row factory on the cursor only: the connection goes back to the pool
+        cursor = connection.cursor()
+        cursor.row_factory = sqlite3.Row
+        fetched = cursor.execute("SELECT lineups_fetched FROM matches WHERE id = ?", (int(match_id),)).fetchone()
+        rows = cursor.execute(
+            "SELECT ml.*, t.name AS team_name, t.logo AS team_logo "
+            "FROM match_lineups ml LEFT JOIN teams t ON t.id = ml.team_id "
+            "WHERE ml.match_id = ? ORDER BY ml.slot",
+            (int(match_id),)
+        ).fetchall()
+    if fetched is None or not fetched['lineups_fetched']:
+        return None
+    return build_lineups([dict(row) for row in rows])
+
+
+@cached_query
+def get_player_appearances(player_id):
+    with read_connection() as connection:
+        query = (
+            "SELECT m.id AS match_id, m.date, m.season, m.competition, m.home_team, m.away_team, "
+            "m.home_score, m.away_score, t.name AS team, ml.starter, ml.position, ml.number "
+            "FROM match_lineups ml "
+            "JOIN matches m ON m.id = ml.match_id "
+            "LEFT JOIN teams t ON t.id = ml.team_id "
+            "WHERE ml.player_id = ? ORDER BY m.kickoff_ts"
+        )
+        df = pd.read_sql(query, connection, params=[int(player_id)])
+    return df
+
+
+def _filter_where(season=None, team=None, competition=None, date=None):
+    where = "WHERE 1=1"
     params = []
 
     if season:
-        query += " AND season = ?"
+        where += " AND season = ?"
         params.append(season)
 
     if team:
-        query += " AND (home_team = ? OR away_team = ?)"
+        # Each side of the OR is served by its own (team, match_date) index
+        where += " AND (home_team = ? OR away_team = ?)"
         params.extend([team, team])
 
     if competition:
-        query += " AND competition = ?"
+        where += " AND competition = ?"
         params.append(competition)
 
     if date:
-        query += " AND substr(date, 1, 10) = ?"
+        where += " AND match_date = ?"
         params.append(date)
 
-    df = pd.read_sql(query, connection, params=params)
-    connection.close()
+    return where, params
+
+
+def _filter_query(season=None, team=None, competition=None, date=None, limit=None, offset=None, after=None):
+    keyset, keyset_params = "", []
+    if after is not None:
+        # Keyset pagination: after is the (kickoff_ts, id) of the last row already shown
+        keyset, keyset_params = " AND (kickoff_ts, id) > (?, ?)", list(after)
+    if team:
+        # Home and away games each come in page order from their own (team, kickoff_ts, id)
+        # index, and SQLite merges the two instead of sorting; a team never plays itself
+        where, params = _filter_where(season=season, competition=competition, date=date)
+        query = (f"SELECT * FROM matches {where} AND home_team = ?{keyset} UNION ALL "
+                 f"SELECT * FROM matches {where} AND away_team = ?{keyset} ORDER BY kickoff_ts, id")
+        params = params + [team] + keyset_params + params + [team] + keyset_params
+    else:
+        where, params = _filter_where(season=season, competition=competition, date=date)
+        query = f"SELECT * FROM matches {where}{keyset} ORDER BY kickoff_ts, id"
+        params = params + keyset_params
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params.extend([int(limit), int(offset or 0)])
+    return query, params
+
+
+def explain_query_plan(query, params=()):
+    with read_connection() as connection:
+        plan = [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+    return plan
+
+
+@cached_query
+def filter_matches(season=None, team=None, competition=None, date=None, limit=None, offset=None, after=None):
+    with read_connection() as connection:
+        query, params = _filter_query(season=season, team=team, competition=competition, date=date,
+                                      limit=limit, offset=offset, after=after)
+        df = pd.read_sql(query, connection, params=params)
+    return df
+
+
+FACET_COLUMNS = {'season': 'season', 'competition': 'competition', 'date': 'match_date'}
+
+
+@cached_query
+def get_match_facets(season=None, team=None, competition=None, date=None):
+    # Options and match counts for each filter, narrowed by the other selected filters
+    selected = {'season': season, 'team': team, 'competition': competition, 'date': date}
+    facets = {}
+    with read_connection() as connection:
+
+        for name, column in FACET_COLUMNS.items():
+            where, params = _filter_where(**{**selected, name: None})
+            facets[name] = connection.execute(
+                f"SELECT {column}, COUNT(*) FROM matches {where} AND {column} IS NOT NULL "
+                f"GROUP BY {column} ORDER BY {column}",
+                params
+            ).fetchall()
+
+        where, params = _filter_where(**{**selected, 'team': None})
+        facets['team'] = connection.execute(
+            f"SELECT team, COUNT(*) FROM ("
+            f"SELECT home_team AS team FROM matches {where} UNION ALL "
+            f"SELECT away_team AS team FROM matches {where}"
+            f") WHERE team IS NOT NULL GROUP BY team ORDER BY team",
+            params + params
+        ).fetchall()
+
+        where, params = _filter_where(**selected)
+        facets['total'] = connection.execute(f"SELECT COUNT(*) FROM matches {where}", params).fetchone()[0]
+    return facets
+
+
+@cached_query
+def search_matches(query, limit=50):
+    # {'matches': best-ranked matches for free text over teams, competitions and players,
+    #  'terms': the words actually searched, one list per query word}
+    version = get_data_version()
+    with read_connection() as connection:
+        groups = expand_query(connection, query, version)
+        if not groups:
+            return {'matches': pd.DataFrame(columns=MATCH_COLUMNS.split(', ') + ['rank']), 'terms': []}
+        sql, params = search_query(connection, groups, MATCH_COLUMNS.split(', '), int(limit), version)
+        df = pd.read_sql(sql, connection, params=params)
+    return {'matches': df, 'terms': groups}
+
+
+@cached_query
+def count_matches(season=None, team=None, competition=None, date=None):
+    with read_connection() as connection:
+        where, params = _filter_where(season=season, team=team, competition=competition, date=date)
+        total = connection.execute(f"SELECT COUNT(*) FROM matches {where}", params).fetchone()[0]
+    return total
+
+
+def _season_results(connection, season, competition, teams=None):
+    # teams: only meetings between these sides
+    query = ("SELECT id, season, competition, home_team, away_team, home_score, away_score, status, matchday "
+             "FROM matches WHERE season = ? AND competition = ?")
+    params = [season, competition]
+    if teams is not None:
+        placeholders = ", ".join("?" for _ in teams)
+        query += f" AND home_team IN ({placeholders}) AND away_team IN ({placeholders})"
+        params += list(teams) * 2
+    return pd.read_sql(query + " ORDER BY kickoff_ts, id", connection, params=params)
+
+
+@cached_query
+def get_standings(season, competition, matchday=None, venue=None):
+    # The latest table comes from the materialized standings rows plus the meetings between
+    # teams level on points; an earlier matchday is recomputed from the results up to it
+    with read_connection() as connection:
+        if matchday is not None:
+            return table_as_of(_season_results(connection, season, competition), matchday, venue=venue)
+        stats = pd.read_sql(
+            f"SELECT team, venue, {', '.join(STAT_COLUMNS)} FROM standings WHERE season = ? AND competition = ?",
+            connection, params=[season, competition]
+        )
+        results = _season_results(connection, season, competition, teams=tied_teams(stats, venue))
+    return league_table(stats, results, venue=venue)
+
+
+@cached_query
+def get_matchday_count(season, competition):
+    with read_connection() as connection:
+        results = _season_results(connection, season, competition)
+    return int(matchdays(results).max()) if len(results) else 0
+
+
+@cached_query
+def get_team_stats(teams, season=None, date_from=None, date_to=None):
+    # Every finished match of one or more teams with its rolling windows, oldest first per team;
+    # one round trip over the (team, season, ...) index however many teams are asked for
+    if isinstance(teams, str):
+        teams = [teams]
+    query = f"SELECT * FROM team_stats WHERE team IN ({', '.join('?' * len(teams))})"
+    params = list(teams)
+    if season is not None:
+        query += " AND season = ?"
+        params.append(str(season))
+    if date_from:
+        query += " AND match_date >= ?"
+        params.append(date_from)
+    if date_to:
+        query += " AND match_date <= ?"
+        params.append(date_to)
+    with read_connection() as connection:
+        df = pd.read_sql(query + " ORDER BY team, season, kickoff_ts, match_id", connection, params=params)
+    df['match_date'] = pd.to_datetime(df['match_date'])
     return df
+
+
+@traced_query
+def get_sync_state(league_id=None, season=None):
+    query = select(sync_state)
+    if league_id is not None:
+        query = query.where(sync_state.c.league_id == int(league_id))
+    if season is not None:
+        query = query.where(sync_state.c.season == str(season))
+    with engine.connect() as conn:
+        return [dict(row._mapping) for row in conn.execute(query)]
+
+
+@traced_query
+def set_sync_state(league_id, season, last_synced_date, fixtures_synced=0):
+    stmt = sqlite_insert(sync_state).values(
+        league_id=int(league_id),
+        season=str(season),
+        last_synced_date=last_synced_date,
+        last_run_at=datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        fixtures_synced=fixtures_synced,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[sync_state.c.league_id, sync_state.c.season],
+        set_={
+            'last_synced_date': stmt.excluded.last_synced_date,
+            'last_run_at': stmt.excluded.last_run_at,
+            'fixtures_synced': sync_state.c.fixtures_synced + stmt.excluded.fixtures_synced,
+        }
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt)
+
+
+@traced_query
+def set_resume_page(league_id, season, page):
+    # Checkpoint for an interrupted paged load; None once the load completes
+    stmt = sqlite_insert(sync_state).values(league_id=int(league_id), season=str(season), resume_page=page)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[sync_state.c.league_id, sync_state.c.season],
+        set_={'resume_page': stmt.excluded.resume_page}
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt)
+
+
+def insert_match_stream(fixtures, chunk_size=200, with_lineups=False, lock=None):
+    # Consumes any iterable of fixtures in fixed-size chunks; each chunk is its own transaction
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    chunk = []
+
+    def flush():
+        if lock is None:
+            counts = insert_matches(chunk, with_lineups=with_lineups)
+        else:
+            with lock:
+                counts = insert_matches(chunk, with_lineups=with_lineups)
+        for name in totals:
+            totals[name] += counts[name]
+        chunk.clear()
+
+    for fixture in fixtures:
+        chunk.append(fixture)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return totals
@@ -0,0 +1,92 @@
+def normalize_lineups(match_id, lineups):
+    # Splits an API /fixtures/lineups response into teams, players and match_lineups rows
+    teams, players, rows = {}, {}, []
+    slot = 0
+    for team_lineup in lineups or []:
+        team = team_lineup.get('team') or {}
+        team_id = team.get('id')
+        if team_id is not None:
+            teams[team_id] = {'id': team_id, 'name': team.get('name'), 'logo': team.get('logo')}
+
+        for starter, key in ((1, 'startXI'), (0, 'substitutes')):
+            for entry in team_lineup.get(key) or []:
+                player = entry.get('player') or {}
+                player_id = player.get('id')
+                if player_id is not None:
+                    players[player_id] = {'id': player_id, 'name': player.get('name')}
+                rows.append({
+                    'match_id': match_id,
+                    'slot': slot,
+                    'team_id': team_id,
+                    'player_id': player_id,
+                    'player_name': player.get('name'),
+                    'number': player.get('number'),
+                    'position': player.get('pos'),
+                    'grid': player.get('grid'),
+                    'starter': starter,
+                    'formation': team_lineup.get('formation'),
+                })
+                slot += 1
+    return list(teams.values()), list(players.values()), rows
+
+
+def build_lineups(rows):
+    # Inverse of normalize_lineups: rebuilds the API shape the pages already render
+    lineups = []
+    by_team = {}
+    for row in sorted(rows, key=lambda r: r['slot']):
+        team_key = row['team_id']
+        if team_key not in by_team:
+            by_team[team_key] = {
+                'team': {'id': row['team_id'], 'name': row['team_name'], 'logo': row['team_logo']},
+                'formation': row['formation'],
+                'startXI': [],
+                'substitutes': [],
+            }
+            lineups.append(by_team[team_key])
+        player = {
+            'player': {
+                'id': row['player_id'],
+                'name': row['player_name'],
+                'number': row['number'],
+                'pos': row['position'],
+                'grid': row['grid'],
+            }
+        }
+        by_team[team_key]['startXI' if row['starter'] else 'substitutes'].append(player)
+    return lineups
+
+
+def save_lineups(conn, lineups_by_id):
+    # lineups_by_id: {match_id: API lineups list}; replaces whatever was stored for those matches
+    teams, players, rows = {}, {}, []
+    for match_id, lineups in lineups_by_id.items():
+        match_teams, match_players, match_rows = normalize_lineups(match_id, lineups)
+        teams.update((team['id'], team) for team in match_teams)
+        players.update((player['id'], player) for player in match_players)
+        rows.extend(match_rows)
+
+    match_ids = [(match_id,) for match_id in lineups_by_id]
+    if not match_ids:
+        return 0
+    if teams:
+        conn.exec_driver_sql(
+            "INSERT INTO teams (id, name, logo) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, logo = COALESCE(excluded.logo, teams.logo)",
+            [(t['id'], t['name'], t['logo']) for t in teams.values()]
+        )
+    if players:
+        conn.exec_driver_sql(
+            "INSERT INTO players (id, name) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET name = excluded.name",
+            [(p['id'], p['name']) for p in players.values()]
+        )
+    conn.exec_driver_sql("DELETE FROM match_lineups WHERE match_id = ?", match_ids)
+    if rows:
+        conn.exec_driver_sql(
+            "INSERT INTO match_lineups (match_id, slot, team_id, player_id, player_name, number, position, "
+            "grid, starter, formation) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(r['match_id'], r['slot'], r['team_id'], r['player_id'], r['player_name'], r['number'],
+              r['position'], r['grid'], r['starter'], r['formation']) for r in rows]
+        )
+    conn.exec_driver_sql("UPDATE matches SET lineups_fetched = 1 WHERE id = ?", match_ids)
+    return len(match_ids)
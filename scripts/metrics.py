@@ -0,0 +1,260 @@
+# In-process instrumentation: timing spans for API calls, database queries and page-render
+# phases. Every span lands in a metrics registry (exported as Prometheus text), in the
+# current rerun's trace (the sidebar diagnostics panel) and in a structured JSON log line.
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv()
+METRICS_PATH = os.getenv("METRICS_PATH", "./data/metrics.prom")
+METRICS_EXPORT_INTERVAL = float(os.getenv("METRICS_EXPORT_INTERVAL", 15))
+# Spans slower than this are logged at INFO; the rest only at DEBUG
+SLOW_SPAN_MS = float(os.getenv("SLOW_SPAN_MS", 500))
+SAMPLE_SIZE = 512
+PREFIX = 'football'
+
+logger = logging.getLogger('football')
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+
+def log_event(event, level=logging.INFO, **fields):
+    # One JSON object per line, e.g. {"ts": ..., "event": "api", "endpoint": "fixtures", ...}
+    if logger.isEnabledFor(level):
+        record = {'ts': round(time.time(), 3), 'level': logging.getLevelName(level), 'event': event, **fields}
+        logger.log(level, json.dumps(record, default=str))
+
+
+class Registry:
+    def __init__(self):
+        self._summaries = {}
+        self._counters = {}
+        self._gauges = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = {'count': 0, 'sum': 0.0, 'max': 0.0,
+                                                  'samples': deque(maxlen=SAMPLE_SIZE)}
+            summary['count'] += 1
+            summary['sum'] += value
+            summary['max'] = max(summary['max'], value)
+            summary['samples'].append(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def summaries(self):
+        # [{'name', 'labels', 'count', 'sum', 'max', 'p50', 'p95'}] for the diagnostics panel
+        with self._lock:
+            items = [(key, dict(summary), sorted(summary['samples'])) for key, summary in self._summaries.items()]
+        rows = []
+        for (name, labels), summary, samples in items:
+            rows.append({
+                'name': name, 'labels': dict(labels), 'count': summary['count'], 'sum': summary['sum'],
+                'max': summary['max'], 'p50': _quantile(samples, 0.5), 'p95': _quantile(samples, 0.95),
+            })
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._summaries.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def to_prometheus(self):
+        with self._lock:
+            summaries = [(key, dict(value), sorted(value['samples'])) for key, value in self._summaries.items()]
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {PREFIX}_{name} {self._help[name]}")
+                lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        for (name, labels), summary, samples in sorted(summaries, key=lambda item: item[0]):
+            header(name, 'summary')
+            for quantile in (0.5, 0.95):
+                lines.append(f"{PREFIX}_{name}{_labels(labels, quantile=quantile)} {_quantile(samples, quantile):.6f}")
+            lines.append(f"{PREFIX}_{name}_sum{_labels(labels)} {summary['sum']:.6f}")
+            lines.append(f"{PREFIX}_{name}_count{_labels(labels)} {summary['count']}")
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{PREFIX}_{name}{_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, 'gauge')
+            lines.append(f"{PREFIX}_{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _quantile(samples, q):
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+registry = Registry()
+registry.describe('api_request_duration_seconds', "API calls through scripts.api._get, by endpoint and outcome")
+registry.describe('api_quota_remaining', "Requests left in the API's rate-limit windows")
+registry.describe('db_query_duration_seconds', "Database reads and writes, by statement label")
+registry.describe('db_query_rows_total', "Rows returned or written, by statement label")
+registry.describe('query_cache_requests_total', "In-process query cache lookups, by label and result")
+registry.describe('render_duration_seconds', "Streamlit page-render phases")
+registry.describe('asset_download_duration_seconds', "Downloads into the local asset cache")
+
+# Metric and label name per span kind
+SPAN_METRICS = {
+    'api': 'api_request_duration_seconds',
+    'db': 'db_query_duration_seconds',
+    'render': 'render_duration_seconds',
+    'asset': 'asset_download_duration_seconds',
+}
+LABEL_FIELDS = {
+    'api': ('endpoint', 'status'),
+    'db': ('label',),
+    'render': ('page', 'phase'),
+    'asset': ('label',),
+}
+
+_trace = threading.local()
+
+
+def start_trace():
+    # Called at the top of a Streamlit rerun; spans recorded on this thread are kept until the next call
+    _trace.spans = []
+    _trace.started = time.perf_counter()
+    return _trace.spans
+
+
+def current_trace():
+    return list(getattr(_trace, 'spans', []))
+
+
+def trace_elapsed_ms():
+    started = getattr(_trace, 'started', None)
+    return (time.perf_counter() - started) * 1000 if started else 0.0
+
+
+@contextmanager
+def span(kind, **fields):
+    # fields: labels and details; the body may add more (e.g. rows, status) to the yielded dict
+    started = time.perf_counter()
+    try:
+        yield fields
+    except Exception as e:
+        fields.setdefault('status', 'error')
+        fields['error'] = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _record(kind, duration, fields)
+
+
+def _record(kind, duration, fields):
+    labels = {name: fields.get(name, '') for name in LABEL_FIELDS.get(kind, ())}
+    registry.observe(SPAN_METRICS.get(kind, f'{kind}_duration_seconds'), duration, **labels)
+    if kind == 'db' and isinstance(fields.get('rows'), int):
+        registry.inc('db_query_rows_total', fields['rows'], **labels)
+
+    duration_ms = round(duration * 1000, 3)
+    spans = getattr(_trace, 'spans', None)
+    if spans is not None:
+        spans.append({'kind': kind, 'duration_ms': duration_ms, **fields})
+    level = logging.INFO if kind == 'api' or duration_ms >= SLOW_SPAN_MS else logging.DEBUG
+    if fields.get('error'):
+        level = logging.WARNING
+    log_event(kind, level, duration_ms=duration_ms, **fields)
+
+
+def row_count(value):
+    if isinstance(value, dict) and 'total' in value:
+        return value['total']
+    if isinstance(value, dict) and {'inserted', 'updated', 'unchanged'} <= set(value):
+        return value['inserted'] + value['updated']
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def traced_query(fn):
+    # Times a database function as one span labelled with its name
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span('db', label=fn.__name__) as fields:
+            value = fn(*args, **kwargs)
+            fields['rows'] = row_count(value)
+        return value
+    return wrapper
+
+
+@contextmanager
+def render_phase(page, phase):
+    with span('render', page=page, phase=phase):
+        yield
+
+
+_last_export = 0.0
+_export_lock = threading.Lock()
+
+
+def export_prometheus(path=None, force=False):
+    # Atomically rewrites the text-format file; without force, at most once per METRICS_EXPORT_INTERVAL
+    global _last_export
+    path = path or METRICS_PATH
+    with _export_lock:
+        now = time.monotonic()
+        if not force and now - _last_export < METRICS_EXPORT_INTERVAL:
+            return None
+        _last_export = now
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(registry.to_prometheus())
+        os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,167 @@
+import json
+import logging
+
+from scripts.assets import team_id_from_logo
+from scripts.lineups import save_lineups
+from scripts.metrics import log_event
+from scripts.search import create_search_index, rebuild_search_index
+from scripts.standings import rebuild_standings
+from scripts.team_stats import rebuild_team_stats
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def _add_column(conn, table, column, column_type):
+    # Fresh databases already get the column from metadata.create_all
+    if column not in _columns(conn, table):
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+def fill_match_dates(conn):
+    # SQLite's date functions understand the API's "+00:00" suffix and normalize to UTC
+    conn.exec_driver_sql(
+        "UPDATE matches SET "
+        "match_date = date(date), "
+        "kickoff_ts = CAST(strftime('%s', date) AS INTEGER) "
+        "WHERE match_date IS NULL AND date IS NOT NULL"
+    )
+
+
+def _001_match_date(conn):
+    _add_column(conn, 'matches', 'match_date', 'VARCHAR')
+    _add_column(conn, 'matches', 'kickoff_ts', 'INTEGER')
+    fill_match_dates(conn)
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_season_competition ON matches (season, competition)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_competition ON matches (competition)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_home_team_date ON matches (home_team, match_date)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_away_team_date ON matches (away_team, match_date)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_match_date ON matches (match_date)")
+
+
+def _002_normalize_lineups(conn):
+    _add_column(conn, 'matches', 'lineups_fetched', 'INTEGER NOT NULL DEFAULT 0')
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_match_lineups_player ON match_lineups (player_id, match_id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_lineups_fetched ON matches (lineups_fetched)")
+    if 'lineups' not in _columns(conn, 'matches'):
+        return
+
+    # Move the legacy JSON blobs into the relational tables, then drop the column
+    blobs = conn.exec_driver_sql("SELECT id, lineups FROM matches WHERE lineups IS NOT NULL").fetchall()
+    lineups_by_id = {}
+    for match_id, blob in blobs:
+        try:
+            lineups_by_id[match_id] = json.loads(blob)
+        except ValueError:
+            log_event('lineups_unreadable', logging.WARNING, match_id=match_id)
+    save_lineups(conn, lineups_by_id)
+    conn.exec_driver_sql("ALTER TABLE matches DROP COLUMN lineups")
+
+
+def _003_sync_resume_page(conn):
+    _add_column(conn, 'sync_state', 'resume_page', 'INTEGER')
+
+
+def _004_standings(conn):
+    # Rounds only arrive with new saves; older fixtures get a matchday derived from kickoff order
+    _add_column(conn, 'matches', 'round', 'VARCHAR')
+    _add_column(conn, 'matches', 'matchday', 'INTEGER')
+    rebuild_standings(conn)
+
+
+def _005_team_stats(conn):
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_team_stats_team_season ON team_stats (team, season, kickoff_ts, match_id)"
+    )
+    rebuild_team_stats(conn)
+
+
+def fill_team_ids(conn):
+    # Older rows only have the logo URL, which carries the team id; move each logo onto its
+    # teams row and keep the per-match copy only where no id could be derived
+    for side in ('home', 'away'):
+        logos = conn.exec_driver_sql(
+            f"SELECT DISTINCT {side}_team, {side}_team_logo FROM matches "
+            f"WHERE {side}_team_id IS NULL AND {side}_team_logo IS NOT NULL"
+        ).fetchall()
+        found = [(team_id_from_logo(logo), name, logo) for name, logo in logos]
+        found = [row for row in found if row[0] is not None]
+        if not found:
+            continue
+        conn.exec_driver_sql(
+            "INSERT INTO teams (id, name, logo) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET logo = COALESCE(teams.logo, excluded.logo)",
+            found
+        )
+        # One pass over matches via a keyed lookup rather than an UPDATE per logo
+        conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS logo_team_ids (logo VARCHAR PRIMARY KEY, id INTEGER)")
+        conn.exec_driver_sql("DELETE FROM logo_team_ids")
+        conn.exec_driver_sql("INSERT OR IGNORE INTO logo_team_ids (logo, id) VALUES (?, ?)",
+                             [(logo, team_id) for team_id, _, logo in found])
+        conn.exec_driver_sql(
+            f"UPDATE matches SET {side}_team_id = (SELECT id FROM logo_team_ids WHERE logo = {side}_team_logo) "
+            f"WHERE {side}_team_id IS NULL AND {side}_team_logo IN (SELECT logo FROM logo_team_ids)"
+        )
+        conn.exec_driver_sql(
+            f"UPDATE matches SET {side}_team_logo = NULL WHERE {side}_team_id IN (SELECT id FROM teams "
+            f"WHERE logo IS NOT NULL)"
+        )
+    conn.exec_driver_sql("DROP TABLE IF EXISTS temp.logo_team_ids")
+
+
+def _006_team_ids(conn):
+    _add_column(conn, 'matches', 'home_team_id', 'INTEGER')
+    _add_column(conn, 'matches', 'away_team_id', 'INTEGER')
+    fill_team_ids(conn)
+
+
+def _007_search_index(conn):
+    if create_search_index(conn):
+        rebuild_search_index(conn)
+
+
+def _008_kickoff_order(conn):
+    # Match lists page in (kickoff_ts, id) order; ending each filter index with it lets a page
+    # read its rows in order instead of sorting the whole result first
+    for name in ('ix_matches_season_competition', 'ix_matches_competition', 'ix_matches_home_team_date',
+                 'ix_matches_away_team_date', 'ix_matches_match_date'):
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_kickoff ON matches (kickoff_ts, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_season_kickoff ON matches (season, kickoff_ts, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_season_competition_kickoff "
+                         "ON matches (season, competition, kickoff_ts, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_competition_kickoff "
+                         "ON matches (competition, kickoff_ts, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_home_team_kickoff ON matches (home_team, kickoff_ts, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_away_team_kickoff ON matches (away_team, kickoff_ts, id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_matches_match_date_kickoff "
+                         "ON matches (match_date, kickoff_ts, id)")
+
+
+MIGRATIONS = [
+    _001_match_date,
+    _002_normalize_lineups,
+    _003_sync_resume_page,
+    _004_standings,
+    _005_team_stats,
+    _006_team_ids,
+    _007_search_index,
+    _008_kickoff_order,
+]
+
+# Row fills that data written before a schema version still needs, keyed by the migration that
+# added them; snapshot imports replay these without the migrations' index and rebuild steps
+DATA_FILLS = [
+    (1, fill_match_dates),
+    (6, fill_team_ids),
+]
+
+
+def migrate(conn):
+    version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        log_event('migration', number=number, name=migration.__name__)
+        migration(conn)
+        conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+    return len(MIGRATIONS)
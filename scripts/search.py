@@ -0,0 +1,204 @@
+# Full-text match search: an FTS5 table with one row per match (rowid = match id) holding its
+# team names, competition and lineup player names, kept current by the save paths in
+# scripts.database. Every query word is matched as a prefix; a word with no hits is widened
+# with known aliases and close spellings from the index vocabulary.
+import bisect
+import difflib
+import logging
+import re
+import unicodedata
+
+from sqlalchemy.exc import OperationalError
+
+from scripts.metrics import log_event
+
+SEARCH_TABLE = 'match_search'
+# bm25 weights for the teams, competition and players columns
+COLUMN_WEIGHTS = (10.0, 4.0, 1.0)
+# Common short forms that are not prefixes of the full name
+ALIASES = {
+    'utd': ['united'],
+    'spurs': ['tottenham'],
+    'wolves': ['wolverhampton'],
+    'psg': ['paris'],
+    'barca': ['barcelona'],
+    'atleti': ['atletico'],
+    'gladbach': ['monchengladbach'],
+    'inter': ['internazionale'],
+}
+FUZZY_CUTOFF = 0.75
+# Words found in more than this share of matches (like "team" or "fc") still filter, but a
+# query made only of them is listed newest first: bm25 would score nearly every row for them
+COMMON_SHARE = 0.2
+# Words with up to this many completions in the index are searched as exact terms
+MAX_COMPLETIONS = 16
+BATCH_SIZE = 500
+
+
+def create_search_index(conn):
+    # False when this SQLite build has no FTS5; search then falls back to LIKE over matches
+    try:
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            f"teams, competition, players, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE}_vocab USING fts5vocab({SEARCH_TABLE}, 'row')"
+        )
+    except OperationalError as e:
+        log_event('search_unavailable', logging.WARNING, error=str(e))
+        return False
+    return True
+
+
+def search_available(connection):
+    return connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).fetchone() is not None
+
+
+def _document_query(where):
+    return (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, teams, competition, players) "
+        f"SELECT m.id, m.home_team || ' ' || m.away_team, m.competition, "
+        f"(SELECT group_concat(player_name, ' ') FROM match_lineups WHERE match_id = m.id) "
+        f"FROM matches m {where}"
+    )
+
+
+def index_matches(conn, match_ids):
+    # (Re)writes the search rows of the given matches inside the caller's transaction
+    match_ids = sorted(match_ids)
+    if not match_ids or not search_available(conn.connection.driver_connection):
+        return 0
+    for start in range(0, len(match_ids), BATCH_SIZE):
+        chunk = tuple(match_ids[start:start + BATCH_SIZE])
+        placeholders = ', '.join('?' * len(chunk))
+        conn.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", chunk)
+        conn.exec_driver_sql(_document_query(f"WHERE m.id IN ({placeholders})"), chunk)
+    return len(match_ids)
+
+
+def rebuild_search_index(conn):
+    if not search_available(conn.connection.driver_connection):
+        return 0
+    conn.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+    return conn.exec_driver_sql(_document_query("")).rowcount
+
+
+def changed_documents(before, after):
+    # Ids whose indexed names differ between two snapshot_results frames, new matches included
+    columns = ['home_team', 'away_team', 'competition']
+    was = before.set_index('id')[columns]
+    now = after.set_index('id')[columns]
+    known = now.index.isin(was.index)
+    same = (now[known] == was.reindex(now.index[known])).all(axis=1)
+    return set(now.index[~known]) | set(same.index[~same.to_numpy()])
+
+
+def tokens(text):
+    # Lower-case words without accents, the way the index's tokenizer stores them
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r'\w+', text)
+
+
+def _next_prefix(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+_vocabulary = (None, [], {}, 0)
+
+
+def vocabulary(connection, version):
+    # (version, sorted terms, {term: matches containing it}, indexed matches), read once per
+    # data version: fts5vocab counts by walking each term's postings, too slow to ask per query
+    global _vocabulary
+    if _vocabulary[0] != version:
+        rows = connection.execute(f"SELECT term, doc FROM {SEARCH_TABLE}_vocab").fetchall()
+        total = connection.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+        _vocabulary = (version, [term for term, _ in rows], dict(rows), total)
+    return _vocabulary
+
+
+def _completions(terms, word):
+    return terms[bisect.bisect_left(terms, word):bisect.bisect_left(terms, _next_prefix(word))]
+
+
+def expand_query(connection, text, version=None):
+    # [[word or its replacements], ...]: one group per query word, every group must match
+    if not search_available(connection):
+        return [[word] + ALIASES.get(word, []) for word in tokens(text)]
+    _, terms, _, _ = vocabulary(connection, version)
+    groups = []
+    for word in tokens(text):
+        found = [word] if _completions(terms, word) else []
+        found += [alias for alias in ALIASES.get(word, []) if _completions(terms, alias)]
+        if not found:
+            # Close spellings among terms with the same first letter
+            candidates = _completions(terms, word[0])
+            found = difflib.get_close_matches(word, candidates, n=3, cutoff=FUZZY_CUTOFF) or [word]
+        if found not in groups:
+            groups.append(found)
+    return groups
+
+
+def match_expression(groups, vocabulary):
+    # FTS5 MATCH syntax; quoted terms are safe from operators. A word with few completions is
+    # spelled out as exact terms, which FTS5 reads lazily; otherwise it becomes a "word"* prefix.
+    _, terms, _, _ = vocabulary
+    parts = []
+    for words in groups:
+        alternatives = []
+        for word in words:
+            completions = _completions(terms, word)
+            if 0 < len(completions) <= MAX_COMPLETIONS:
+                alternatives += [f'"{term}"' for term in completions]
+            else:
+                alternatives.append(f'"{word}"*')
+        parts.append('(' + ' OR '.join(alternatives) + ')')
+    return ' AND '.join(parts)
+
+
+def _is_common(words, vocabulary):
+    _, terms, docs, total = vocabulary
+    return sum(docs[term] for word in words for term in _completions(terms, word)) > COMMON_SHARE * total
+
+
+def _is_broad(words, vocabulary):
+    # Searched as a "word"* prefix: cheap to filter by, slow to score every hit of
+    return any(len(_completions(vocabulary[1], word)) > MAX_COMPLETIONS for word in words)
+
+
+def search_query(connection, groups, columns, limit, version=None):
+    # (sql, params) returning the given matches columns plus rank, best first
+    select = ', '.join(f"m.{column}" for column in columns)
+    if search_available(connection):
+        words = vocabulary(connection, version)
+        ranked = [group for group in groups if not _is_common(group, words) and not _is_broad(group, words)]
+        if not ranked:
+            # Nothing selective to rank by: newest first, which FTS5 reads in rowid order without sorting
+            return (
+                f"SELECT {select}, 0.0 AS rank FROM {SEARCH_TABLE} JOIN matches m ON m.id = {SEARCH_TABLE}.rowid "
+                f"WHERE {SEARCH_TABLE} MATCH ? ORDER BY {SEARCH_TABLE}.rowid DESC LIMIT ?",
+                [match_expression(groups, words), limit]
+            )
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        return (
+            f"SELECT {select}, bm25({SEARCH_TABLE}, {weights}) AS rank FROM {SEARCH_TABLE} "
+            f"JOIN matches m ON m.id = {SEARCH_TABLE}.rowid WHERE {SEARCH_TABLE} MATCH ? "
+            f"ORDER BY rank, m.kickoff_ts DESC LIMIT ?",
+            # Every word filters; bm25 gives the common ones next to no weight
+            [match_expression(groups, words), limit]
+        )
+    # Without FTS5: LIKE over team and competition names, unranked and without players
+    where, params = [], []
+    for terms in groups:
+        where.append('(' + ' OR '.join('m.home_team LIKE ? OR m.away_team LIKE ? OR m.competition LIKE ?'
+                                       for _ in terms) + ')')
+        params += [f'%{term}%' for term in terms for _ in range(3)]
+    return (
+        f"SELECT {select}, 0.0 AS rank FROM matches m WHERE {' AND '.join(where)} "
+        f"ORDER BY m.kickoff_ts DESC LIMIT ?",
+        params + [limit]
+    )
@@ -0,0 +1,231 @@
+# Bulk snapshots of the match database, for seeding or restoring without spending API quota:
+#   python -m scripts.snapshot export data/snapshot.ndjson.gz
+#   python -m scripts.snapshot import data/snapshot.ndjson.gz [--merge]
+# A snapshot is gzip-compressed NDJSON: a header line, then per table a {"table": ...} line
+# followed by one JSON array per row. Standings, team_stats and the search index are rebuilt on import.
+import argparse
+import gzip
+import io
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from scripts.analytics import refresh_mirror
+from scripts.database import _bump_data_version, engine, init_db, metadata, read_connection
+from scripts.metrics import log_event, span
+from scripts.migrations import DATA_FILLS
+from scripts.search import rebuild_search_index
+from scripts.standings import rebuild_standings
+from scripts.team_stats import rebuild_team_stats
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMAT = 'football-snapshot'
+FORMAT_VERSION = 1
+# Parents before children; standings, team_stats and match_search are derived and not exported
+SNAPSHOT_TABLES = ['leagues', 'league_seasons', 'teams', 'players', 'matches', 'match_lineups', 'sync_state']
+BATCH_SIZE = 10_000
+COMPRESS_LEVEL = 6
+
+
+def _dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value) + b'\n'
+    return (json.dumps(value, separators=(',', ':'), ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _loads(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _primary_key(table):
+    return [column.name for column in metadata.tables[table].primary_key.columns]
+
+
+def export_snapshot(path, tables=SNAPSHOT_TABLES):
+    counts = {}
+    tmp_path = f"{path}.tmp"
+    with span('db', label='export_snapshot') as fields, read_connection() as connection:
+        # One read transaction, so every table comes from the same moment
+        connection.execute("BEGIN")
+        try:
+            columns = {table: [column.name for column in metadata.tables[table].columns] for table in tables}
+            header = {
+                'format': FORMAT,
+                'version': FORMAT_VERSION,
+                'schema_version': connection.execute("PRAGMA user_version").fetchone()[0],
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'tables': {table: {
+                    'columns': columns[table],
+                    'rows': connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0],
+                } for table in tables},
+            }
+            with gzip.open(tmp_path, 'wb', compresslevel=COMPRESS_LEVEL) as f:
+                f.write(_dumps(header))
+                for table in tables:
+                    f.write(_dumps({'table': table}))
+                    cursor = connection.execute(
+                        f"SELECT {', '.join(columns[table])} FROM {table} ORDER BY {', '.join(_primary_key(table))}"
+                    )
+                    counts[table] = 0
+                    while rows := cursor.fetchmany(BATCH_SIZE):
+                        f.write(b''.join(map(_dumps, rows)))
+                        counts[table] += len(rows)
+            os.replace(tmp_path, path)
+        finally:
+            connection.rollback()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        fields['rows'] = sum(counts.values())
+    log_event('snapshot_exported', path=path, **counts)
+    return counts
+
+
+def read_snapshot(f):
+    # Returns the header and an iterator of (table, rows) batches of at most BATCH_SIZE rows
+    header = _loads(f.readline())
+    if header.get('format') != FORMAT:
+        raise ValueError("not a football snapshot")
+    if header['version'] > FORMAT_VERSION:
+        raise ValueError(f"snapshot format {header['version']} is newer than this version reads ({FORMAT_VERSION})")
+
+    def batches():
+        table, rows = None, []
+        for line in f:
+            record = _loads(line)
+            if isinstance(record, dict):
+                if rows:
+                    yield table, rows
+                table, rows = record['table'], []
+                continue
+            rows.append(record)
+            if len(rows) >= BATCH_SIZE:
+                yield table, rows
+                rows = []
+        if rows:
+            yield table, rows
+
+    return header, batches()
+
+
+def _insert_statement(table, columns, merge):
+    statement = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join('?' * len(columns))})")
+    if not merge:
+        return statement
+    key = _primary_key(table)
+    values = [column for column in columns if column not in key]
+    if not values:
+        return statement + f" ON CONFLICT ({', '.join(key)}) DO NOTHING"
+    # Upsert, skipping rows that would not change
+    return (statement + f" ON CONFLICT ({', '.join(key)}) DO UPDATE SET "
+            + ', '.join(f"{column} = excluded.{column}" for column in values)
+            + f" WHERE ({', '.join(f'{table}.{column}' for column in values)}) "
+            + f"IS NOT ({', '.join(f'excluded.{column}' for column in values)})")
+
+
+def _drop_indexes(conn, tables):
+    # Secondary indexes only; primary keys stay so merges can still find conflicts
+    placeholders = ', '.join('?' * len(tables))
+    indexes = conn.exec_driver_sql(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        f"AND tbl_name IN ({placeholders})", tuple(tables)
+    ).fetchall()
+    for name, _ in indexes:
+        conn.exec_driver_sql(f'DROP INDEX "{name}"')
+    return indexes
+
+
+def import_snapshot(path, merge=False):
+    # Without merge the snapshot's tables must be empty; with it, snapshot rows win on conflict
+    counts = {}
+    with span('db', label='import_snapshot') as fields, gzip.open(path, 'rb') as f, engine.begin() as conn:
+        # GzipFile.readline is pure Python; a buffered reader splits lines in C
+        header, batches = read_snapshot(io.BufferedReader(f, buffer_size=1 << 20))
+        tables = [table for table in header['tables'] if table in SNAPSHOT_TABLES]
+        existing = {table: conn.exec_driver_sql(f"SELECT COUNT(*) FROM {table}").scalar() for table in tables}
+        if not merge and any(existing.values()):
+            occupied = ', '.join(f"{table} ({rows})" for table, rows in existing.items() if rows)
+            raise ValueError(f"database already has rows in {occupied}; use merge to upsert into it")
+
+        # Indexes are rebuilt once at the end when the snapshot is at least as big as what is there
+        deferred = [table for table in tables if header['tables'][table]['rows'] >= existing[table]]
+        indexes = _drop_indexes(conn, deferred + ['team_stats'])
+
+        local_columns = {table: {column.name for column in metadata.tables[table].columns} for table in tables}
+        statements = {}
+        replaced_lineups = set()
+        for table, rows in batches:
+            if table not in tables:
+                continue
+            snapshot_columns = header['tables'][table]['columns']
+            keep = [index for index, column in enumerate(snapshot_columns) if column in local_columns[table]]
+            if table not in statements:
+                statements[table] = _insert_statement(table, [snapshot_columns[index] for index in keep], merge)
+            if len(keep) == len(snapshot_columns):
+                rows = list(map(tuple, rows))
+            else:
+                rows = [tuple(row[index] for index in keep) for row in rows]
+
+            if merge and table == 'match_lineups':
+                # A match's lineup is replaced as a whole, so no slots from the old one linger
+                match_ids = {row[snapshot_columns.index('match_id')] for row in rows} - replaced_lineups
+                if match_ids:
+                    conn.exec_driver_sql("DELETE FROM match_lineups WHERE match_id = ?", [(i,) for i in match_ids])
+                replaced_lineups |= match_ids
+            conn.exec_driver_sql(statements[table], rows)
+            counts[table] = counts.get(table, 0) + len(rows)
+
+        # Older snapshots lack values later migrations fill in (match_date, team ids); derived
+        # tables and indexes are rebuilt below either way, so only the row fills are replayed
+        for number, fill in DATA_FILLS:
+            if number > header.get('schema_version', 0):
+                fill(conn)
+        rebuild_standings(conn)
+        rebuild_team_stats(conn)
+        rebuild_search_index(conn)
+        present = {name for (name,) in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name, sql in indexes:
+            if name not in present:
+                conn.exec_driver_sql(sql)
+        _bump_data_version(conn)
+        fields['rows'] = sum(counts.values())
+    log_event('snapshot_imported', path=path, merge=merge, **counts)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import a compressed snapshot of the match database.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help="write the database to a .ndjson.gz snapshot")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--tables', nargs='+', choices=SNAPSHOT_TABLES, default=SNAPSHOT_TABLES)
+    import_parser = commands.add_parser('import', help="load a snapshot into the database")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--merge', action='store_true',
+                               help="upsert into a database that already has data (snapshot rows win)")
+    args = parser.parse_args(argv)
+
+    init_db()
+    started = time.perf_counter()
+    if args.command == 'export':
+        tables = [table for table in SNAPSHOT_TABLES if table in args.tables]
+        counts = export_snapshot(args.path, tables)
+        size = os.path.getsize(args.path) / 1024 / 1024
+        print(f"[SNAPSHOT] Exported {counts} to {args.path} ({size:.1f} MB) "
+              f"in {time.perf_counter() - started:.1f}s")
+    else:
+        try:
+            counts = import_snapshot(args.path, merge=args.merge)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"[SNAPSHOT] Imported {counts} from {args.path} in {time.perf_counter() - started:.1f}s")
+        refresh_mirror()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+# League tables from full-time results. Everything is NumPy group-by arithmetic over
+# one row per (match, side); the `standings` table holds the running totals per
+# (season, competition, team, venue) and is kept current by adding deltas on every save.
+import re
+
+import numpy as np
+import pandas as pd
+
+FINISHED = ('FT', 'AET', 'PEN')
+KEY_COLUMNS = ['season', 'competition', 'team', 'venue']
+STAT_COLUMNS = ['played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'points']
+RESULT_COLUMNS = ['id', 'season', 'competition', 'home_team', 'away_team', 'home_score', 'away_score', 'status']
+# Ties on points are broken by the mini-table between the tied teams, then overall goal difference
+TIEBREAKERS = ['points', 'h2h_points', 'h2h_goal_difference', 'h2h_goals_for', 'goal_difference', 'goals_for']
+
+
+def parse_matchday(round_name):
+    # "Regular Season - 12" -> 12; cup rounds ("Round of 16", "Final") have no matchday
+    match = re.search(r'-\s*(\d+)\s*$', round_name or '')
+    return int(match.group(1)) if match else None
+
+
+def _finished(results):
+    mask = results['status'].isin(FINISHED) & results['home_score'].notna() & results['away_score'].notna()
+    return results[mask.to_numpy()]
+
+
+def side_stats(results, sign=1):
+    # One row per (finished match, side) with that side's W/D/L, goals and points
+    results = _finished(results)
+    home_goals = results['home_score'].to_numpy(dtype=np.int64)
+    away_goals = results['away_score'].to_numpy(dtype=np.int64)
+    goals_for = np.concatenate([home_goals, away_goals])
+    goals_against = np.concatenate([away_goals, home_goals])
+    won = (goals_for > goals_against).astype(np.int64)
+    drawn = (goals_for == goals_against).astype(np.int64)
+    sides = {
+        'season': np.tile(results['season'].to_numpy(dtype=object), 2),
+        'competition': np.tile(results['competition'].to_numpy(dtype=object), 2),
+        'team': np.concatenate([results['home_team'].to_numpy(dtype=object),
+                                results['away_team'].to_numpy(dtype=object)]),
+        'venue': np.repeat(np.array(['home', 'away'], dtype=object), len(results)),
+    }
+    values = np.column_stack([
+        np.ones_like(won), won, drawn, 1 - won - drawn, goals_for, goals_against, 3 * won + drawn,
+    ]) * sign
+    return sides, values
+
+
+def group_sum(keys, values):
+    # keys: {name: array}; sums each column of values per distinct key combination
+    codes, uniques = zip(*(pd.factorize(pd.Series(column), use_na_sentinel=False) for column in keys.values()))
+    shape = tuple(max(len(unique), 1) for unique in uniques)
+    combined = np.ravel_multi_index(codes, shape) if len(values) else np.zeros(0, dtype=np.int64)
+    groups, inverse = np.unique(combined, return_inverse=True)
+    sums = np.column_stack([np.bincount(inverse, weights=values[:, i], minlength=len(groups))
+                            for i in range(values.shape[1])]) if len(groups) else np.zeros((0, values.shape[1]))
+    group_codes = np.unravel_index(groups, shape)
+    frame = {name: np.asarray(unique, dtype=object)[code]
+             for name, unique, code in zip(keys, uniques, group_codes)}
+    return pd.DataFrame(frame).join(pd.DataFrame(sums.astype(np.int64), columns=STAT_COLUMNS))
+
+
+def totals(results):
+    # Standings rows (KEY_COLUMNS + STAT_COLUMNS) for a frame of matches
+    sides, values = side_stats(results)
+    return group_sum(sides, values)
+
+
+def delta(before, after):
+    # Net change to the standings when the `before` rows of some fixtures become `after`
+    before_sides, before_values = side_stats(before, sign=-1)
+    after_sides, after_values = side_stats(after)
+    keys = {name: np.concatenate([before_sides[name], after_sides[name]]) for name in KEY_COLUMNS}
+    changes = group_sum(keys, np.concatenate([before_values, after_values]))
+    return changes[changes[STAT_COLUMNS].any(axis=1)]
+
+
+def _read_results(conn, ids):
+    rows = []
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows += conn.exec_driver_sql(
+            f"SELECT {', '.join(RESULT_COLUMNS)} FROM matches WHERE id IN ({', '.join('?' * len(chunk))})",
+            tuple(chunk)
+        ).fetchall()
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def _add_standings(conn, changes):
+    if changes.empty:
+        return 0
+    columns = KEY_COLUMNS + STAT_COLUMNS
+    updates = ', '.join(f"{name} = standings.{name} + excluded.{name}" for name in STAT_COLUMNS)
+    conn.exec_driver_sql(
+        f"INSERT INTO standings ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT(season, competition, team, venue) DO UPDATE SET {updates}",
+        [tuple(row) for row in changes[columns].itertuples(index=False, name=None)]
+    )
+    # A team whose only result was revoked (postponed, annulled) drops back out of the table
+    conn.exec_driver_sql("DELETE FROM standings WHERE played = 0")
+    return len(changes)
+
+
+def snapshot_results(conn, ids):
+    # Read the same fixtures before and after an upsert; update_standings applies the difference
+    return _read_results(conn, list(ids))
+
+
+def update_standings(conn, before, after):
+    return _add_standings(conn, delta(before, after))
+
+
+def rebuild_standings(conn):
+    conn.exec_driver_sql("DELETE FROM standings")
+    rows = conn.exec_driver_sql(f"SELECT {', '.join(RESULT_COLUMNS)} FROM matches").fetchall()
+    return _add_standings(conn, totals(pd.DataFrame(rows, columns=RESULT_COLUMNS)))
+
+
+def matchdays(results):
+    # The stored matchday where the round names one, otherwise the later of the two
+    # sides' game count in kickoff order (results must be sorted by kickoff)
+    n = len(results)
+    # Home and away side of each match interleaved, so games are counted in kickoff order
+    teams = np.column_stack([results['home_team'].to_numpy(dtype=object),
+                             results['away_team'].to_numpy(dtype=object)]).ravel()
+    game_number = pd.Series(teams).groupby(teams).cumcount().to_numpy().reshape(n, 2) + 1
+    derived = game_number.max(axis=1)
+    stored = pd.to_numeric(results['matchday'], errors='coerce').to_numpy(dtype=float) \
+        if 'matchday' in results else np.full(n, np.nan)
+    return np.where(np.isnan(stored), derived, stored).astype(np.int64)
+
+
+def _team_points(stats, venue=None):
+    if venue:
+        stats = stats[stats['venue'] == venue]
+    return stats.groupby('team')['points'].sum()
+
+
+def tied_teams(stats, venue=None):
+    # Teams level on points with someone else; only their meetings matter for head-to-head
+    points = _team_points(stats, venue)
+    return sorted(points[points.duplicated(keep=False)].index)
+
+
+def _head_to_head(table, results):
+    # A meeting belongs to a mini-table exactly when both sides are level on points,
+    # so every group of tied teams is settled in one vectorized pass
+    points = pd.Series(table['points'].to_numpy(), index=table['team'].to_numpy())
+    results = _finished(results)
+    home_points = results['home_team'].map(points).to_numpy(dtype=float)
+    away_points = results['away_team'].map(points).to_numpy(dtype=float)
+    sides, values = side_stats(results[home_points == away_points])
+    mini = group_sum({'team': sides['team']}, values).set_index('team').reindex(table['team'], fill_value=0)
+    return np.column_stack([mini['points'], mini['goals_for'] - mini['goals_against'], mini['goals_for']])
+
+
+def _teams(results):
+    return pd.unique(np.concatenate([results['home_team'].to_numpy(dtype=object),
+                                     results['away_team'].to_numpy(dtype=object)]))
+
+
+def league_table(stats, results, teams=None, venue=None, head_to_head=True):
+    # stats: standings rows for one season/competition; results: its matches, used for
+    # head-to-head (meetings between tied teams are enough). teams adds sides without a
+    # result yet; venue restricts the table to home or away games.
+    teams = _teams(results) if teams is None else np.asarray(teams, dtype=object)
+    teams = pd.unique(np.concatenate([teams, stats['team'].to_numpy(dtype=object)]))
+    if venue:
+        stats = stats[stats['venue'] == venue]
+    table = stats.groupby('team')[STAT_COLUMNS].sum().reindex(teams, fill_value=0)
+    table = table.rename_axis('team').reset_index()
+    table.insert(table.columns.get_loc('points'), 'goal_difference', table['goals_for'] - table['goals_against'])
+
+    h2h = _head_to_head(table, results) if head_to_head else np.zeros((len(table), 3), dtype=np.int64)
+    table[['h2h_points', 'h2h_goal_difference', 'h2h_goals_for']] = h2h
+    table = table.sort_values(TIEBREAKERS + ['team'], ascending=[False] * len(TIEBREAKERS) + [True],
+                              ignore_index=True)
+    table.insert(0, 'position', np.arange(1, len(table) + 1))
+    return table.drop(columns=['h2h_points', 'h2h_goal_difference', 'h2h_goals_for'])
+
+
+def table_as_of(results, matchday, venue=None, head_to_head=True):
+    # Recomputes the table from the matches played up to and including `matchday`
+    played = results[matchdays(results) <= matchday]
+    return league_table(totals(played), played, teams=_teams(results), venue=venue, head_to_head=head_to_head)
@@ -0,0 +1,131 @@
+# Headless incremental sync for cron: python -m scripts.sync 39 140 --season 2023
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from scripts import api
+from scripts.analytics import refresh_mirror
+from scripts.metrics import export_prometheus
+from scripts.database import (init_db, insert_match_stream, backfill_lineups, get_sync_state, set_sync_state,
+                              set_resume_page)
+
+CHUNK_SIZE = 200
+
+# Re-check a few days before the watermark: results can be corrected or finish late
+OVERLAP_DAYS = 3
+
+_write_lock = threading.Lock()
+
+
+def sync_window(league_id, season, overlap_days=OVERLAP_DAYS):
+    today = datetime.now(timezone.utc).date()
+    state = get_sync_state(league_id, season)
+    if not state or not state[0]['last_synced_date']:
+        return None, today.isoformat()
+    last = datetime.strptime(state[0]['last_synced_date'], '%Y-%m-%d').date()
+    return (last - timedelta(days=overlap_days)).isoformat(), today.isoformat()
+
+
+def sync_league(league_id, season, with_lineups=False, overlap_days=OVERLAP_DAYS, chunk_size=CHUNK_SIZE):
+    started = time.perf_counter()
+    date_from, date_to = sync_window(league_id, season, overlap_days)
+    # First run for this league/season takes the whole season, resuming an interrupted load
+    state = get_sync_state(league_id, season)
+    start_page = (state[0]['resume_page'] if state else None) or 1
+
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    fetched = 0
+    complete = False
+    pages = api.iter_fixture_pages(league_id, season, date_from=date_from, date_to=date_to,
+                                   start_page=start_page, refresh=True)
+    for page, total_pages, fixtures in pages:
+        # Parallel fetches, serialized writes: SQLite has a single writer anyway
+        counts = insert_match_stream(fixtures, chunk_size=chunk_size, with_lineups=with_lineups, lock=_write_lock)
+        for name in totals:
+            totals[name] += counts[name]
+        fetched += len(fixtures)
+        if page < total_pages:
+            set_resume_page(league_id, season, page + 1)
+        complete = page >= total_pages
+
+    if not complete:
+        # A page failed; keep the checkpoint and the old watermark so the next run resumes here
+        raise RuntimeError(f"fixture download stopped early after {fetched} fixtures")
+
+    with _write_lock:
+        set_sync_state(league_id, season, date_to, totals['inserted'] + totals['updated'])
+        set_resume_page(league_id, season, None)
+
+    return {
+        'league': league_id,
+        'season': season,
+        'window': f"{date_from or 'season start'} .. {date_to}",
+        'fetched': fetched,
+        **totals,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def quota_left(reserve):
+    remaining = api.get_quota()['daily_remaining']
+    return remaining is None or remaining > reserve
+
+
+def sync_many(pairs, with_lineups=False, workers=4, reserve=10, overlap_days=OVERLAP_DAYS, chunk_size=CHUNK_SIZE):
+    def run(pair):
+        league_id, season = pair
+        if not quota_left(reserve):
+            print(f"[SYNC] Skipping league {league_id} ({season}): daily quota reserve reached")
+            return None
+        try:
+            return sync_league(league_id, season, with_lineups=with_lineups, overlap_days=overlap_days,
+                               chunk_size=chunk_size)
+        except Exception as e:
+            print(f"[SYNC] League {league_id} ({season}) failed: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [result for result in executor.map(run, pairs) if result]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally sync finished fixtures into the local database.")
+    parser.add_argument('leagues', nargs='*', type=int, help="API league ids to sync")
+    parser.add_argument('--season', action='append', help="season year (repeatable)")
+    parser.add_argument('--tracked', action='store_true', help="also sync every league/season synced before")
+    parser.add_argument('--lineups', action='store_true', help="fetch lineups for synced fixtures")
+    parser.add_argument('--backfill-lineups', type=int, default=0, metavar='N',
+                        help="afterwards, fetch lineups for up to N stored matches that have none")
+    parser.add_argument('--workers', type=int, default=4, help="leagues synced in parallel")
+    parser.add_argument('--reserve', type=int, default=10, help="daily requests to leave unused")
+    parser.add_argument('--overlap-days', type=int, default=OVERLAP_DAYS)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="fixtures written per transaction")
+    args = parser.parse_args(argv)
+
+    # --tracked reads sync_state, which a fresh or older database only has after migrating
+    init_db()
+    pairs = [(league_id, season) for league_id in args.leagues for season in args.season or []]
+    if args.tracked:
+        pairs += [(row['league_id'], row['season']) for row in get_sync_state()]
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs and not args.backfill_lineups:
+        parser.error("nothing to sync: pass league ids with --season, or --tracked")
+
+    for result in sync_many(pairs, with_lineups=args.lineups, workers=args.workers,
+                            reserve=args.reserve, overlap_days=args.overlap_days, chunk_size=args.chunk_size):
+        print(f"[SYNC] League {result['league']} ({result['season']}) {result['window']}: "
+              f"fetched {result['fetched']}, {result['inserted']} new, {result['updated']} updated, "
+              f"{result['unchanged']} unchanged in {result['seconds']}s")
+
+    if args.backfill_lineups and quota_left(args.reserve):
+        filled = backfill_lineups(limit=args.backfill_lineups)
+        print(f"[SYNC] Backfilled lineups for {filled} matches")
+    refresh_mirror()
+    print(f"[SYNC] Quota: {api.get_quota()} | cache: {api.get_cache_stats()}")
+    print(f"[SYNC] Metrics written to {export_prometheus(force=True)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# Per-team rolling form, materialized in `team_stats`: one row per team per finished match,
+# carrying the season-to-date totals and last-5/last-10 windows up to and including it.
+# Windows and streaks are cumulative-sum arithmetic over each team's ordered fixture list.
+import numpy as np
+import pandas as pd
+
+from scripts.standings import FINISHED, RESULT_COLUMNS
+
+WINDOWS = (5, 10)
+SOURCE_COLUMNS = ['id', 'season', 'competition', 'kickoff_ts', 'match_date', 'home_team', 'away_team',
+                  'home_score', 'away_score', 'status']
+TEAM_STATS_COLUMNS = (
+    ['team', 'match_id', 'season', 'competition', 'kickoff_ts', 'match_date', 'venue', 'opponent',
+     'goals_for', 'goals_against', 'result', 'points', 'clean_sheet',
+     'played', 'season_points', 'season_goals_for', 'season_goals_against', 'season_clean_sheets']
+    + [f'{name}_{window}' for window in WINDOWS for name in ('form_points', 'goals_for', 'goals_against')]
+    + ['scoring_streak', 'unbeaten_streak']
+)
+# Team lists longer than this are not worth binding; the season filter alone is used instead
+MAX_TEAM_FILTER = 500
+
+
+def _sides(results):
+    mask = results['status'].isin(FINISHED) & results['home_score'].notna() & results['away_score'].notna()
+    results = results[mask.to_numpy()]
+    column = {name: results[name].to_numpy(dtype=object) for name in SOURCE_COLUMNS}
+    home_score = results['home_score'].to_numpy(dtype=np.int64)
+    away_score = results['away_score'].to_numpy(dtype=np.int64)
+    sides = pd.DataFrame({
+        'team': np.concatenate([column['home_team'], column['away_team']]),
+        'match_id': np.tile(results['id'].to_numpy(dtype=np.int64), 2),
+        'season': np.tile(column['season'], 2),
+        'competition': np.tile(column['competition'], 2),
+        'kickoff_ts': np.tile(column['kickoff_ts'], 2),
+        'match_date': np.tile(column['match_date'], 2),
+        'venue': np.repeat(np.array(['home', 'away'], dtype=object), len(results)),
+        'opponent': np.concatenate([column['away_team'], column['home_team']]),
+        'goals_for': np.concatenate([home_score, away_score]),
+        'goals_against': np.concatenate([away_score, home_score]),
+    })
+    return sides.sort_values(['team', 'season', 'kickoff_ts', 'match_id'], ignore_index=True)
+
+
+def _streak(flags, group_start, index):
+    # Consecutive True values ending at each row, restarting at every group
+    last_break = np.maximum.accumulate(np.where(flags, -1, index))
+    return index - np.maximum(last_break, group_start - 1)
+
+
+def compute_team_stats(results):
+    # results: matches rows (SOURCE_COLUMNS); returns TEAM_STATS_COLUMNS rows for every finished match side
+    sides = _sides(results)
+    n = len(sides)
+    index = np.arange(n)
+    team = sides['team'].to_numpy(dtype=object)
+    season = sides['season'].to_numpy(dtype=object)
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (team[1:] != team[:-1]) | (season[1:] != season[:-1])
+    group_start = np.maximum.accumulate(np.where(new_group, index, 0)) if n else index
+
+    goals_for = sides['goals_for'].to_numpy()
+    goals_against = sides['goals_against'].to_numpy()
+    won = goals_for > goals_against
+    drawn = goals_for == goals_against
+    points = 3 * won + drawn
+    clean_sheet = (goals_against == 0).astype(np.int64)
+    sides['result'] = np.where(won, 'W', np.where(drawn, 'D', 'L'))
+    sides['points'] = points
+    sides['clean_sheet'] = clean_sheet
+
+    def window_sum(values, window=None):
+        totals = np.concatenate([[0], np.cumsum(values)])
+        lower = group_start if window is None else np.maximum(index - window + 1, group_start)
+        return totals[index + 1] - totals[lower]
+
+    sides['played'] = index - group_start + 1
+    sides['season_points'] = window_sum(points)
+    sides['season_goals_for'] = window_sum(goals_for)
+    sides['season_goals_against'] = window_sum(goals_against)
+    sides['season_clean_sheets'] = window_sum(clean_sheet)
+    for window in WINDOWS:
+        sides[f'form_points_{window}'] = window_sum(points, window)
+        sides[f'goals_for_{window}'] = window_sum(goals_for, window)
+        sides[f'goals_against_{window}'] = window_sum(goals_against, window)
+    sides['scoring_streak'] = _streak(goals_for > 0, group_start, index)
+    sides['unbeaten_streak'] = _streak(goals_for >= goals_against, group_start, index)
+    return sides[TEAM_STATS_COLUMNS]
+
+
+def changed_team_seasons(before, after):
+    # (team, season) pairs touched by fixtures that were added or changed between two snapshots
+    known = after['id'].isin(before['id']).to_numpy()
+    now = after[known].set_index('id')[RESULT_COLUMNS[1:]]
+    was = before.set_index('id')[RESULT_COLUMNS[1:]].reindex(now.index)
+    same = (now == was) | (now.isna() & was.isna())
+    changed_ids = np.concatenate([after.loc[~known, 'id'].to_numpy(), now.index[~same.all(axis=1).to_numpy()]])
+    pairs = set()
+    for frame in (after, before):
+        frame = frame[frame['id'].isin(changed_ids)]
+        for side in ('home_team', 'away_team'):
+            pairs.update(zip(frame[side], frame['season']))
+    return pairs
+
+
+def _read_sources(conn, pairs):
+    seasons = sorted({season for _, season in pairs})
+    teams = sorted({team for team, _ in pairs})
+    query = f"SELECT {', '.join(SOURCE_COLUMNS)} FROM matches WHERE season IN ({', '.join('?' * len(seasons))})"
+    params = list(seasons)
+    if len(teams) <= MAX_TEAM_FILTER:
+        placeholders = ', '.join('?' * len(teams))
+        query += f" AND (home_team IN ({placeholders}) OR away_team IN ({placeholders}))"
+        params += teams * 2
+    return pd.DataFrame(conn.exec_driver_sql(query, tuple(params)).fetchall(), columns=SOURCE_COLUMNS)
+
+
+def _write_team_stats(conn, rows):
+    if rows.empty:
+        return 0
+    conn.exec_driver_sql(
+        f"INSERT INTO team_stats ({', '.join(TEAM_STATS_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(TEAM_STATS_COLUMNS))})",
+        # Column-wise tolist gives plain Python values without a 2-D object array
+        list(zip(*(rows[name].tolist() for name in TEAM_STATS_COLUMNS)))
+    )
+    return len(rows)
+
+
+def update_team_stats(conn, before, after):
+    # Rebuilds the windows of every team-season a save touched; others are left alone
+    pairs = changed_team_seasons(before, after)
+    if not pairs:
+        return 0
+    rows = compute_team_stats(_read_sources(conn, pairs))
+    keep = pd.MultiIndex.from_arrays([rows['team'], rows['season']]).isin(list(pairs))
+    conn.exec_driver_sql("DELETE FROM team_stats WHERE team = ? AND season = ?", list(pairs))
+    return _write_team_stats(conn, rows[keep])
+
+
+def rebuild_team_stats(conn):
+    conn.exec_driver_sql("DELETE FROM team_stats")
+    rows = conn.exec_driver_sql(f"SELECT {', '.join(SOURCE_COLUMNS)} FROM matches").fetchall()
+    return _write_team_stats(conn, compute_team_stats(pd.DataFrame(rows, columns=SOURCE_COLUMNS)))
+
+
+def form_string(stats, window=5):
+    # Most recent result last, e.g. "WWDLW"
+    return ''.join(stats['result'].tail(window))
@@ -1,6 +1,6 @@
 import plotly.graph_objects as go
-from scripts.database import get_all_matches
-import pandas as pd
+import numpy as np
+from scripts.database import get_team_stats
 
 
 def plot_match_goals(match_df):
@@ -49,21 +49,20 @@ def plot_match_goals(match_df):
     return fig
 
 
-def plot_team_performance(team_name):
-    matches = get_all_matches()
-    team_data = matches[(matches['home_team'] == team_name) | (matches['away_team'] == team_name)]
+def plot_team_performance(team_name, stats=None):
+    # stats: rows from get_team_stats; pass them in to share one read between several plots
+    if stats is None:
+        stats = get_team_stats(team_name)
+    team_data = stats[stats['team'] == team_name]
 
-    team_data['date'] = pd.to_datetime(team_data['date'])
-    team_data = team_data.sort_values('date')
-
-    team_data_home = team_data[team_data['home_team'] == team_name]
-    team_data_away = team_data[team_data['away_team'] == team_name]
+    team_data_home = team_data[team_data['venue'] == 'home']
+    team_data_away = team_data[team_data['venue'] == 'away']
 
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
-        x=team_data_home['date'],
-        y=team_data_home['home_score'],
+        x=team_data_home['match_date'],
+        y=team_data_home['goals_for'],
         mode='lines+markers',
         name=f'{team_name} Home',
         line=dict(color='#EB8A3E', width=4),
@@ -71,8 +70,8 @@ def plot_team_performance(team_name):
     ))
 
     fig.add_trace(go.Scatter(
-        x=team_data_away['date'],
-        y=team_data_away['away_score'],
+        x=team_data_away['match_date'],
+        y=team_data_away['goals_for'],
         mode='lines+markers',
         name=f'{team_name} Away',
         line=dict(color='#EBB582', width=4),
@@ -102,3 +101,94 @@ def plot_team_performance(team_name):
     )
 
     return fig
+
+
+def plot_team_form(team_name, stats=None):
+    # Rolling points per game over the last 5 and 10 matches, from the materialized windows
+    if stats is None:
+        stats = get_team_stats(team_name)
+    team_data = stats[stats['team'] == team_name]
+
+    fig = go.Figure()
+    for window, color in ((5, '#EB8A3E'), (10, '#EBB582')):
+        games = np.minimum(team_data['played'], window)
+        fig.add_trace(go.Scatter(
+            x=team_data['match_date'],
+            y=team_data[f'form_points_{window}'] / games,
+            mode='lines+markers',
+            name=f'Last {window}',
+            line=dict(color=color, width=4),
+            marker=dict(size=8, color=color),
+            customdata=team_data[['opponent', 'result', 'goals_for', 'goals_against']],
+            hovertemplate='%{x|%d %b %Y}: %{y:.2f} pts/game<br>%{customdata[1]} %{customdata[2]}-%{customdata[3]}'
+                          ' vs %{customdata[0]}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title=f'{team_name} Form',
+        title_font=dict(color='#EB8A3E', size=24),
+        plot_bgcolor='black',
+        paper_bgcolor='black',
+        font=dict(color='white', size=14),
+        xaxis=dict(
+            tickangle=45,
+            showgrid=True,
+            gridcolor='#555555',
+            zeroline=False,
+            title='Date'
+        ),
+        yaxis=dict(
+            title='Points per game',
+            range=[0, 3.1],
+            showgrid=True,
+            gridcolor='#555555',
+            zeroline=False
+        ),
+        hoverlabel=dict(bgcolor="black", font_size=16, font_family="Arial")
+    )
+
+    return fig
+
+
+def plot_team_season_trends(trends):
+    # trends: rows from analytics.team_season_trends, one per team and season
+    fig = go.Figure()
+    colors = ['#EB8A3E', '#EBB582', '#BC6D4F', '#FFFFFF', '#8A3E1E']
+
+    for i, (team, team_data) in enumerate(trends.groupby('team', sort=True)):
+        team_data = team_data.sort_values('season')
+        fig.add_trace(go.Scatter(
+            x=team_data['season'].astype(str),
+            y=team_data['points'] / team_data['played'],
+            mode='lines+markers',
+            name=team,
+            line=dict(color=colors[i % len(colors)], width=4),
+            marker=dict(size=8, color=colors[i % len(colors)]),
+            customdata=team_data[['wins', 'draws', 'losses', 'goals_for', 'goals_against']],
+            hovertemplate='%{x}: %{y:.2f} pts/game<br>W %{customdata[0]} D %{customdata[1]} L %{customdata[2]}'
+                          '<br>Goals %{customdata[3]}-%{customdata[4]}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title='Points per Game by Season',
+        title_font=dict(color='#EB8A3E', size=24),
+        plot_bgcolor='black',
+        paper_bgcolor='black',
+        font=dict(color='white', size=14),
+        xaxis=dict(
+            type='category',
+            showgrid=True,
+            gridcolor='#555555',
+            zeroline=False,
+            title='Season'
+        ),
+        yaxis=dict(
+            title='Points per game',
+            showgrid=True,
+            gridcolor='#555555',
+            zeroline=False
+        ),
+        hoverlabel=dict(bgcolor="black", font_size=16, font_family="Arial")
+    )
+
+    return fig
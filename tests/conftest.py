@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+import pytest
+
+# scripts.database and scripts.api read their paths at import time
+_workdir = tempfile.mkdtemp()
+os.environ['DB_PATH'] = os.path.join(_workdir, 'test.db')
+os.environ['API_CACHE_PATH'] = os.path.join(_workdir, 'api_cache.db')
+os.environ['METRICS_PATH'] = os.path.join(_workdir, 'metrics.prom')
+
+from scripts import database  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    # Every test starts from empty tables; bumping the data version drops cached reads
+    database.init_db()
+    with database.engine.begin() as conn:
+        for table in reversed(database.metadata.sorted_tables):
+            if table.name != 'meta':
+                conn.execute(table.delete())
+        conn.exec_driver_sql("DELETE FROM match_search")
+        database._bump_data_version(conn)
+    return database
+
@@ -0,0 +1,16 @@
+import zlib
+
+
+def api_fixture(match_id, home, away, home_score=1, away_score=0, competition='Premier League', season=2023,
+                date='2023-08-12T14:00:00+00:00', matchday=1, status='FT'):
+    # API-shaped /fixtures item; team ids are derived from the name so a team keeps one id
+    home_id, away_id = (zlib.crc32(name.encode()) % 100_000 for name in (home, away))
+    return {
+        'fixture': {'id': match_id, 'date': date, 'status': {'short': status}},
+        'league': {'id': 39, 'name': competition, 'season': season, 'round': f'Regular Season - {matchday}'},
+        'teams': {
+            'home': {'id': home_id, 'name': home, 'logo': f'https://media.api-sports.io/football/teams/{home_id}.png'},
+            'away': {'id': away_id, 'name': away, 'logo': f'https://media.api-sports.io/football/teams/{away_id}.png'},
+        },
+        'score': {'fulltime': {'home': home_score, 'away': away_score}},
+    }
@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+
+from scripts import cache as cache_module
+from scripts.cache import FOREVER, ResponseCache, make_key
+
+
+def test_keys_ignore_parameter_order():
+    assert make_key('/fixtures/', {'season': 2023, 'league': 39}) == make_key('fixtures', {'league': 39, 'season': 2023})
+
+
+def test_only_closed_windows_of_finished_fixtures_are_kept_forever(tmp_path):
+    responses = ResponseCache(str(tmp_path / 'cache.db'))
+    assert responses.ttl_for('fixtures', {'status': 'FT', 'to': '2000-01-01'}) is FOREVER
+    assert responses.ttl_for('fixtures', {'status': 'FT', 'season': 2000}) is FOREVER
+    assert responses.ttl_for('fixtures', {'status': 'FT', 'to': '2999-01-01'}) == 60 * 60
+    assert responses.ttl_for('fixtures/lineups') is FOREVER
+
+
+def test_entries_expire_and_every_connection_is_closed(tmp_path, monkeypatch):
+    opened = []
+    sqlite_connect = sqlite3.connect
+
+    def connect(*args, **kwargs):
+        opened.append(sqlite_connect(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(cache_module.sqlite3, 'connect', connect)
+    responses = ResponseCache(str(tmp_path / 'cache.db'))
+    responses.store('leagues', {'response': []}, ttl=-1)
+    assert responses.lookup('leagues') == {'body': {'response': []}, 'etag': None, 'last_modified': None,
+                                           'fresh': False}
+    responses.touch('leagues', FOREVER)
+    assert responses.lookup('leagues')['fresh']
+    responses.invalidate()
+    assert responses.lookup('leagues') is None
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
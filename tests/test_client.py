@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+import requests
+
+from scripts import client as client_module
+from scripts.client import ApiClient, QuotaExhausted, TokenBucket
+
+
+class FakeSession:
+    def __init__(self, remaining):
+        self.remaining = remaining
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['x-ratelimit-requests-limit'] = '100'
+        response.headers['x-ratelimit-requests-remaining'] = str(self.remaining)
+        return response
+
+
+def test_exhausted_daily_quota_blocks_until_the_utc_day_changes(monkeypatch):
+    today = [date(2024, 1, 1)]
+    monkeypatch.setattr(client_module, '_utc_day', lambda: today[0])
+    api = ApiClient('https://example.test', {}, per_minute=600)
+    api.session = FakeSession(remaining=0)
+
+    api.get('fixtures')
+    with pytest.raises(QuotaExhausted):
+        api.get('fixtures')
+    assert api.session.calls == 1
+
+    today[0] = date(2024, 1, 2)
+    api.session.remaining = 99
+    assert api.get_quota()['daily_remaining'] is None
+    api.get('fixtures')
+    assert api.session.calls == 2
+    assert api.get_quota()['daily_remaining'] == 99
+
+
+def test_token_bucket_waits_once_the_server_reports_the_window_used_up(monkeypatch):
+    clock = [100.0]
+    slept = []
+    monkeypatch.setattr(client_module.time, 'monotonic', lambda: clock[0])
+
+    def sleep(seconds):
+        slept.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(client_module.time, 'sleep', sleep)
+    bucket = TokenBucket(per_minute=60)
+    bucket.acquire()
+    assert slept == []
+
+    bucket.sync(limit=30, remaining=0)
+    bucket.acquire()
+    assert slept == [pytest.approx(2.0)]
+    assert bucket.capacity == 30
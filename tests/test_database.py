@@ -0,0 +1,21 @@
+from tests.factories import api_fixture
+
+
+def test_upsert_counts_distinguish_new_changed_and_unchanged_fixtures(db):
+    fixtures = [api_fixture(i, 'Arsenal', opponent) for i, opponent in enumerate(['Chelsea', 'Everton'], start=1)]
+    assert db.insert_matches(fixtures, with_lineups=False) == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    version = db.get_data_version()
+
+    assert db.insert_matches(fixtures, with_lineups=False) == {'inserted': 0, 'updated': 0, 'unchanged': 2}
+    assert db.get_data_version() == version
+
+    changed = [api_fixture(1, 'Arsenal', 'Chelsea', 3, 3), api_fixture(3, 'Fulham', 'Arsenal')]
+    assert db.insert_matches(changed, with_lineups=False) == {'inserted': 1, 'updated': 1, 'unchanged': 0}
+    assert db.get_data_version() > version
+    assert db.get_match(1).iloc[0][['home_score', 'away_score']].tolist() == [3, 3]
+
+
+def test_duplicate_fixtures_in_one_payload_keep_the_last_copy(db):
+    fixtures = [api_fixture(1, 'Arsenal', 'Chelsea', 0, 0), api_fixture(1, 'Arsenal', 'Chelsea', 2, 1)]
+    assert db.insert_matches(fixtures, with_lineups=False)['inserted'] == 1
+    assert db.get_match(1).iloc[0][['home_score', 'away_score']].tolist() == [2, 1]
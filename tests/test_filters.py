@@ -0,0 +1,47 @@
+import itertools
+
+import pytest
+
+from tests.factories import api_fixture
+
+FILTERS = {'season': '2023', 'team': 'Arsenal', 'competition': 'Premier League', 'date': '2023-08-12'}
+
+
+def _save_matches(db):
+    fixtures = [
+        api_fixture(1, 'Arsenal', 'Chelsea', date='2023-08-12T14:00:00+00:00'),
+        api_fixture(2, 'Everton', 'Arsenal', date='2023-08-19T14:00:00+00:00'),
+        api_fixture(3, 'Chelsea', 'Everton', date='2023-08-19T14:00:00+00:00'),
+        api_fixture(4, 'Arsenal', 'Everton', date='2023-08-26T14:00:00+00:00', competition='FA Cup'),
+        api_fixture(5, 'Chelsea', 'Arsenal', date='2024-08-17T14:00:00+00:00', season=2024),
+    ]
+    db.insert_matches(fixtures, with_lineups=False)
+
+
+def test_team_filter_pages_home_and_away_games_in_kickoff_order(db):
+    _save_matches(db)
+    assert list(db.filter_matches(team='Arsenal')['id']) == [1, 2, 4, 5]
+    assert list(db.filter_matches(team='Arsenal', season='2023', competition='Premier League')['id']) == [1, 2]
+    assert list(db.filter_matches(team='Arsenal', limit=2, offset=2)['id']) == [4, 5]
+    assert db.count_matches(team='Arsenal') == 4
+
+
+def test_keyset_pages_match_offset_pages(db):
+    _save_matches(db)
+    for filters in ({}, {'team': 'Everton'}, {'season': '2023'}):
+        first = db.filter_matches(**filters, limit=2, offset=0)
+        last = first.iloc[-1]
+        after = (int(last['kickoff_ts']), int(last['id']))
+        assert list(db.filter_matches(**filters, limit=2, after=after)['id']) == \
+            list(db.filter_matches(**filters, limit=2, offset=2)['id'])
+
+
+@pytest.mark.parametrize('names', [names for size in range(len(FILTERS) + 1)
+                                   for names in itertools.combinations(FILTERS, size)])
+def test_no_filter_combination_scans_or_sorts(db, names):
+    # Every filter set the "View matches" page can send, first page and keyset pages alike
+    filters = {name: FILTERS[name] for name in names}
+    for page in ({'offset': 0}, {'after': (1_700_000_000, 10)}):
+        query, params = db._filter_query(**filters, limit=10, **page)
+        plan = db.explain_query_plan(query, params)
+        assert not [step for step in plan if step == 'SCAN matches' or 'TEMP B-TREE' in step], plan
@@ -0,0 +1,83 @@
+import sqlite3
+
+from benchmarks.synthetic import make_lineups
+from scripts.search import expand_query, search_query, tokens
+from tests.factories import api_fixture
+
+
+def _save_arsenal_season(db):
+    league = [api_fixture(i, 'Arsenal', opponent, date=f'2023-09-{i:02d}T14:00:00+00:00')
+              for i, opponent in enumerate(['Chelsea', 'Everton', 'Fulham', 'Brentford'], start=1)]
+    cup = [api_fixture(10 + i, 'Arsenal', opponent, competition='FA Cup', date=f'2024-01-{i:02d}T14:00:00+00:00')
+           for i, opponent in enumerate(['Manchester United', 'Atlético Madrid'], start=1)]
+    db.insert_matches(league + cup, with_lineups=False)
+
+
+def _ids(result):
+    return set(result['matches']['id'])
+
+
+def test_every_query_word_filters(db):
+    # "arsenal" is in every match, so it is too common to rank by, but it must still filter
+    _save_arsenal_season(db)
+    assert _ids(db.search_matches('arsenal cup')) == {11, 12}
+    assert _ids(db.search_matches('arsenal premier')) == {1, 2, 3, 4}
+    assert _ids(db.search_matches('arsenal chelsea')) == {1}
+    assert _ids(db.search_matches('chelsea cup')) == set()
+
+
+def test_common_words_alone_list_newest_first(db):
+    _save_arsenal_season(db)
+    assert list(db.search_matches('arsenal')['matches']['id']) == [12, 11, 4, 3, 2, 1]
+
+
+def test_prefix_alias_accent_and_fuzzy_matching(db):
+    _save_arsenal_season(db)
+    assert _ids(db.search_matches('brent')) == {4}
+    assert _ids(db.search_matches('Man Utd')) == {11}
+    assert _ids(db.search_matches('atletico')) == {12}
+    assert _ids(db.search_matches('Evertn')) == {2}
+    assert db.search_matches('Evertn')['terms'] == [['everton']]
+
+
+def test_query_syntax_is_not_interpreted(db):
+    _save_arsenal_season(db)
+    assert _ids(db.search_matches('"chelsea* ^(:')) == {1}
+    assert db.search_matches('chelsea OR fulham')['matches'].empty
+    assert db.search_matches('')['matches'].empty
+    assert db.search_matches('zzzz')['matches'].empty
+
+
+def test_lineup_players_are_searchable(db, monkeypatch):
+    match = api_fixture(1, 'Arsenal', 'Chelsea')
+    lineups = make_lineups(match)
+    lineups[0]['startXI'][0]['player']['name'] = 'Bukayo Saka'
+    monkeypatch.setattr(db, 'get_lineups_for_matches', lambda ids, **kwargs: {1: lineups})
+    db.insert_matches([match])
+    assert _ids(db.search_matches('saka')) == {1}
+
+
+def test_renamed_team_is_reindexed(db):
+    db.insert_matches([api_fixture(1, 'Arsenal', 'Chelsea')], with_lineups=False)
+    assert db.search_matches('fc')['matches'].empty
+    db.insert_matches([api_fixture(1, 'Arsenal', 'Chelsea FC')], with_lineups=False)
+    assert db.get_match(1).iloc[0]['away_team'] == 'Chelsea FC'
+    assert _ids(db.search_matches('fc')) == {1}
+    assert set(db.get_standings('2023', 'Premier League')['team']) == {'Arsenal', 'Chelsea FC'}
+
+
+def test_tokens_fold_case_and_accents():
+    assert tokens("Atlético  Madrid-B") == ['atletico', 'madrid', 'b']
+
+
+def test_like_fallback_without_search_table():
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE matches (id, home_team, away_team, competition, kickoff_ts)")
+    connection.executemany("INSERT INTO matches VALUES (?, ?, ?, ?, ?)", [
+        (1, 'Manchester United', 'Arsenal', 'Premier League', 1),
+        (2, 'Manchester City', 'Arsenal', 'FA Cup', 2),
+    ])
+    groups = expand_query(connection, 'manchester utd')
+    assert groups == [['manchester'], ['utd', 'united']]
+    query, params = search_query(connection, groups, ['id'], 10)
+    assert connection.execute(query, params).fetchall() == [(1, 0.0)]
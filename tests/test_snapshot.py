@@ -0,0 +1,114 @@
+import gzip
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_lineups
+from scripts import snapshot
+from tests.factories import api_fixture
+
+
+def _save_season(db, monkeypatch):
+    fixtures = [
+        api_fixture(1, 'Arsenal', 'Chelsea', 2, 0, date='2023-08-12T14:00:00+00:00', matchday=1),
+        api_fixture(2, 'Chelsea', 'Everton', 1, 1, date='2023-08-19T14:00:00+00:00', matchday=2),
+        api_fixture(3, 'Everton', 'Arsenal', 0, 3, date='2023-08-26T14:00:00+00:00', matchday=3),
+    ]
+    lineups = {fixture['fixture']['id']: make_lineups(fixture) for fixture in fixtures}
+    monkeypatch.setattr(db, 'get_lineups_for_matches', lambda ids, **kwargs: {i: lineups[i] for i in ids})
+    db.insert_matches(fixtures)
+
+
+def _table(db, name):
+    with db.read_connection() as connection:
+        return pd.read_sql(f"SELECT * FROM {name} ORDER BY 1, 2", connection)
+
+
+def _clear(db):
+    with db.engine.begin() as conn:
+        for table in reversed(snapshot.SNAPSHOT_TABLES + ['standings', 'team_stats', 'match_search']):
+            conn.exec_driver_sql(f"DELETE FROM {table}")
+        db._bump_data_version(conn)
+
+
+def _indexes(db):
+    with db.read_connection() as connection:
+        return {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_round_trip_restores_rows_and_derived_tables(db, monkeypatch, tmp_path):
+    _save_season(db, monkeypatch)
+    saved = {name: _table(db, name) for name in snapshot.SNAPSHOT_TABLES + ['standings', 'team_stats']}
+    indexes = _indexes(db)
+    path = str(tmp_path / 'snapshot.ndjson.gz')
+
+    counts = snapshot.export_snapshot(path)
+    assert counts['matches'] == 3 and counts['match_lineups'] == 3 * 36
+    _clear(db)
+    assert snapshot.import_snapshot(path) == {name: rows for name, rows in counts.items() if rows}
+
+    for name, frame in saved.items():
+        pd.testing.assert_frame_equal(_table(db, name), frame, check_dtype=False)
+    assert _indexes(db) == indexes
+    assert set(db.search_matches('everton')['matches']['id']) == {2, 3}
+    assert list(db.get_standings('2023', 'Premier League')['team'])[0] == 'Arsenal'
+
+
+def test_import_refuses_a_populated_database_unless_merging(db, monkeypatch, tmp_path):
+    _save_season(db, monkeypatch)
+    path = str(tmp_path / 'snapshot.ndjson.gz')
+    snapshot.export_snapshot(path)
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE matches SET home_score = 0 WHERE id = 1")
+        conn.exec_driver_sql("DELETE FROM match_lineups WHERE match_id = 2 AND slot > 5")
+
+    with pytest.raises(ValueError):
+        snapshot.import_snapshot(path)
+    snapshot.import_snapshot(path, merge=True)
+    assert db.get_match(1).iloc[0]['home_score'] == 2
+    assert sum(len(team['startXI']) + len(team['substitutes']) for team in db.get_match_lineups(2)) == 36
+
+
+def test_older_snapshots_get_later_columns_filled(db, monkeypatch, tmp_path):
+    # A schema 0 snapshot has neither match_date/kickoff_ts nor team ids; its matches carry
+    # the logo URLs the ids are derived from
+    _save_season(db, monkeypatch)
+    path = str(tmp_path / 'snapshot.ndjson.gz')
+    old_path = str(tmp_path / 'old.ndjson.gz')
+    snapshot.export_snapshot(path)
+    dropped = {'match_date', 'kickoff_ts', 'home_team_id', 'away_team_id'}
+    with gzip.open(path, 'rb') as f:
+        header, batches = snapshot.read_snapshot(f)
+        tables = {}
+        for table, rows in batches:
+            tables.setdefault(table, []).extend(rows)
+    columns = header['tables']['matches']['columns']
+    keep = [index for index, column in enumerate(columns) if column not in dropped]
+    header['schema_version'] = 0
+    header['tables']['matches']['columns'] = [columns[index] for index in keep]
+    logos = {team_id: logo for team_id, _, logo in tables['teams']}
+    home_id, away_id, home_logo, away_logo = (columns.index(name) for name in (
+        'home_team_id', 'away_team_id', 'home_team_logo', 'away_team_logo'))
+    for row in tables['matches']:
+        row[home_logo], row[away_logo] = logos[row[home_id]], logos[row[away_id]]
+    tables['matches'] = [[row[index] for index in keep] for row in tables['matches']]
+    with gzip.open(old_path, 'wb') as f:
+        f.write(snapshot._dumps(header))
+        for table, rows in tables.items():
+            f.write(snapshot._dumps({'table': table}))
+            f.write(b''.join(map(snapshot._dumps, rows)))
+
+    expected = _table(db, 'matches')
+    _clear(db)
+    snapshot.import_snapshot(old_path)
+    pd.testing.assert_frame_equal(_table(db, 'matches'), expected, check_dtype=False)
+
+
+def test_failed_export_leaves_no_partial_file(db, monkeypatch, tmp_path):
+    _save_season(db, monkeypatch)
+    path = str(tmp_path / 'snapshot.ndjson.gz')
+    monkeypatch.setattr(snapshot, '_dumps', lambda value: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        snapshot.export_snapshot(path)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,95 @@
+import pandas as pd
+
+from scripts.standings import (STAT_COLUMNS, league_table, matchdays, parse_matchday, rebuild_standings,
+                               table_as_of, totals)
+from tests.factories import api_fixture
+
+
+def _results(games):
+    # games: (home, away, home_score, away_score[, matchday]) in kickoff order
+    rows = [{'id': i, 'season': '2023', 'competition': 'Premier League', 'home_team': game[0], 'away_team': game[1],
+             'home_score': game[2], 'away_score': game[3], 'status': 'FT' if game[2] is not None else 'NS',
+             'matchday': game[4] if len(game) > 4 else None}
+            for i, game in enumerate(games, start=1)]
+    return pd.DataFrame(rows)
+
+
+def _order(results, **kwargs):
+    return list(league_table(totals(results), results, **kwargs)['team'])
+
+
+def test_level_teams_are_split_by_their_meetings_before_goal_difference():
+    # Arsenal and Chelsea both have 6 points; Arsenal's goal difference is better but Chelsea won the meeting
+    results = _results([
+        ('Chelsea', 'Arsenal', 1, 0),
+        ('Arsenal', 'Everton', 5, 0),
+        ('Chelsea', 'Fulham', 1, 0),
+        ('Everton', 'Chelsea', 1, 0),
+        ('Fulham', 'Arsenal', 1, 0),
+        ('Arsenal', 'Brentford', 4, 0),
+    ])
+    table = league_table(totals(results), results)
+    assert list(table['team'][:2]) == ['Chelsea', 'Arsenal']
+    assert list(table['points'][:2]) == [6, 6]
+    assert _order(results, head_to_head=False)[:2] == ['Arsenal', 'Chelsea']
+
+
+def test_three_way_tie_uses_the_mini_table():
+    # Every side beat one of the others; the mini-table goal difference decides
+    results = _results([
+        ('Arsenal', 'Chelsea', 3, 0),
+        ('Chelsea', 'Everton', 2, 0),
+        ('Everton', 'Arsenal', 1, 0),
+        ('Fulham', 'Everton', 0, 5),
+    ])
+    assert _order(results) == ['Everton', 'Arsenal', 'Chelsea', 'Fulham']
+
+
+def test_table_columns_and_unplayed_teams():
+    results = _results([('Arsenal', 'Chelsea', 2, 1), ('Everton', 'Fulham', None, None)])
+    table = league_table(totals(results), results)
+    assert list(table['position']) == [1, 2, 3, 4]
+    assert table.set_index('team').loc['Arsenal', STAT_COLUMNS].tolist() == [1, 1, 0, 0, 2, 1, 3]
+    assert table.set_index('team').loc['Everton', 'played'] == 0
+
+
+def test_venue_tables_and_tables_as_of_a_matchday():
+    results = _results([
+        ('Arsenal', 'Chelsea', 0, 1, 1),
+        ('Chelsea', 'Arsenal', 0, 2, 2),
+        ('Arsenal', 'Chelsea', 3, 0, 3),
+    ])
+    assert _order(results, venue='home') == ['Arsenal', 'Chelsea']
+    assert list(league_table(totals(results), results, venue='away')['points']) == [3, 3]
+    assert list(table_as_of(results, 1)['team']) == ['Chelsea', 'Arsenal']
+    assert list(table_as_of(results, 2)['points']) == [3, 3]
+
+
+def test_matchdays_fall_back_to_game_count_in_kickoff_order():
+    results = _results([('Arsenal', 'Chelsea', 1, 0), ('Everton', 'Arsenal', 1, 0), ('Chelsea', 'Everton', 1, 0),
+                        ('Fulham', 'Arsenal', 1, 0, 7)])
+    assert list(matchdays(results)) == [1, 2, 2, 7]
+    assert parse_matchday('Regular Season - 12') == 12
+    assert parse_matchday('Round of 16') is None
+
+
+def test_saved_corrections_update_standings_like_a_rebuild(db):
+    db.insert_matches([
+        api_fixture(1, 'Arsenal', 'Chelsea', 2, 0, date='2023-08-12T14:00:00+00:00'),
+        api_fixture(2, 'Chelsea', 'Everton', 1, 1, date='2023-08-19T14:00:00+00:00', matchday=2),
+    ], with_lineups=False)
+    # A corrected score and a match that turns out to be postponed
+    db.insert_matches([
+        api_fixture(1, 'Arsenal', 'Chelsea', 0, 1, date='2023-08-12T14:00:00+00:00'),
+        api_fixture(2, 'Chelsea', 'Everton', None, None, date='2023-08-19T14:00:00+00:00', matchday=2,
+                    status='PST'),
+    ], with_lineups=False)
+    incremental = db.get_standings('2023', 'Premier League')
+    # Everton's only result was revoked, so it drops out of the table
+    assert list(incremental['team']) == ['Chelsea', 'Arsenal']
+    assert list(incremental['points']) == [3, 0]
+
+    with db.engine.begin() as conn:
+        rebuild_standings(conn)
+        db._bump_data_version(conn)
+    pd.testing.assert_frame_equal(db.get_standings('2023', 'Premier League'), incremental)
@@ -0,0 +1,96 @@
+import random
+
+import pandas as pd
+
+from scripts.team_stats import SOURCE_COLUMNS, TEAM_STATS_COLUMNS, compute_team_stats, form_string, rebuild_team_stats
+from tests.factories import api_fixture
+
+
+def _results(count, seed=7):
+    rng = random.Random(seed)
+    teams = ['Arsenal', 'Chelsea', 'Everton', 'Fulham']
+    rows = []
+    for match_id in range(1, count + 1):
+        home, away = rng.sample(teams, 2)
+        status = rng.choice(['FT', 'FT', 'FT', 'AET', 'NS'])
+        rows.append({
+            'id': match_id, 'season': rng.choice(['2022', '2023']), 'competition': 'Premier League',
+            'kickoff_ts': rng.randrange(10_000), 'match_date': '2023-01-01', 'home_team': home, 'away_team': away,
+            'home_score': None if status == 'NS' else rng.randrange(4),
+            'away_score': None if status == 'NS' else rng.randrange(3), 'status': status,
+        })
+    return pd.DataFrame(rows, columns=SOURCE_COLUMNS)
+
+
+def _expected(results):
+    # The same numbers, one team-season at a time with plain loops
+    rows = []
+    finished = results[results['status'] != 'NS']
+    for team_column, sign in (('home_team', 1), ('away_team', -1)):
+        for match in finished.itertuples():
+            goals = (match.home_score, match.away_score)[::sign]
+            rows.append({'team': getattr(match, team_column), 'match_id': match.id, 'season': match.season,
+                         'kickoff_ts': match.kickoff_ts, 'goals_for': goals[0], 'goals_against': goals[1]})
+    expected = []
+    for _, games in pd.DataFrame(rows).groupby(['team', 'season']):
+        games = games.sort_values(['kickoff_ts', 'match_id']).to_dict('records')
+        scoring = unbeaten = 0
+        for i, game in enumerate(games):
+            points = [3 if g['goals_for'] > g['goals_against'] else int(g['goals_for'] == g['goals_against'])
+                      for g in games[:i + 1]]
+            scoring = scoring + 1 if game['goals_for'] > 0 else 0
+            unbeaten = unbeaten + 1 if game['goals_for'] >= game['goals_against'] else 0
+            expected.append({
+                'team': game['team'], 'match_id': game['match_id'], 'played': i + 1,
+                'season_points': sum(points), 'form_points_5': sum(points[-5:]), 'form_points_10': sum(points[-10:]),
+                'goals_for_5': sum(g['goals_for'] for g in games[max(0, i - 4):i + 1]),
+                'goals_against_10': sum(g['goals_against'] for g in games[max(0, i - 9):i + 1]),
+                'scoring_streak': scoring, 'unbeaten_streak': unbeaten,
+            })
+    return pd.DataFrame(expected).sort_values(['team', 'match_id'], ignore_index=True)
+
+
+def test_windows_and_streaks_match_a_plain_loop():
+    results = _results(200)
+    stats = compute_team_stats(results)
+    assert list(stats.columns) == TEAM_STATS_COLUMNS
+    expected = _expected(results)
+    actual = stats[expected.columns].sort_values(['team', 'match_id'], ignore_index=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_no_finished_matches_gives_no_rows():
+    assert compute_team_stats(_results(5).assign(status='NS')).empty
+
+
+def test_saves_update_the_touched_team_seasons_like_a_rebuild(db):
+    fixtures = [api_fixture(i, home, away, i % 3, 1, date=f'2023-09-{i:02d}T14:00:00+00:00')
+                for i, (home, away) in enumerate([('Arsenal', 'Chelsea'), ('Chelsea', 'Everton'),
+                                                  ('Everton', 'Arsenal'), ('Arsenal', 'Fulham')], start=1)]
+    db.insert_matches(fixtures, with_lineups=False)
+    db.insert_matches([api_fixture(2, 'Chelsea', 'Everton', 0, 4, date='2023-09-02T14:00:00+00:00')],
+                      with_lineups=False)
+    incremental = {team: db.get_team_stats(team) for team in ('Arsenal', 'Chelsea', 'Everton', 'Fulham')}
+    assert form_string(incremental['Everton']) == 'WL'
+    assert list(incremental['Everton']['goals_for_5']) == [4, 4]
+    assert list(incremental['Chelsea']['form_points_5']) == [1, 1]
+
+    with db.engine.begin() as conn:
+        rebuild_team_stats(conn)
+        db._bump_data_version(conn)
+    for team, stats in incremental.items():
+        pd.testing.assert_frame_equal(db.get_team_stats(team), stats)
+
+
+def test_several_teams_and_a_date_window_in_one_read(db):
+    db.insert_matches([
+        api_fixture(1, 'Arsenal', 'Chelsea', 2, 0, season=2022, date='2022-08-13T14:00:00+00:00'),
+        api_fixture(2, 'Chelsea', 'Everton', 1, 1, date='2023-08-19T14:00:00+00:00'),
+        api_fixture(3, 'Everton', 'Arsenal', 0, 3, date='2023-08-26T14:00:00+00:00'),
+    ], with_lineups=False)
+    history = db.get_team_stats(['Arsenal', 'Chelsea'])
+    assert list(zip(history['team'], history['match_id'])) == [('Arsenal', 1), ('Arsenal', 3), ('Chelsea', 1),
+                                                              ('Chelsea', 2)]
+    window = db.get_team_stats(['Arsenal', 'Chelsea'], date_from='2023-01-01', date_to='2023-08-20')
+    assert list(zip(window['team'], window['match_id'])) == [('Chelsea', 2)]
+    assert list(db.get_team_stats('Arsenal', 2023)['match_id']) == [3]